@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import sys
-from pathlib import Path
 
 from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import is_truthy
 
-from .debugcmd import DebugCmd, ReplCmd, is_step_mode
+from .breakpoints import Breakpoint, BreakpointTable
+from .debugcmd import DebugCmd, ReplCmd, is_step_mode, prewarm_completion
 from .globals import StepMode
-from .styles import ERROR_STYLE, LOW_VISIBILITY_STYLE, print_output
+from .profiler import KeywordProfiler
+from .robotkeyword import invalidate_lib_keywords, reload_resource
+from .robotlib import get_libs
+from .sourcelines import step_renderer
+from .styles import ERROR_STYLE, print_error, print_output
 from .version import VERSION
 
 MUTING_KEYWORDS = [
@@ -23,45 +28,145 @@ class Listener:
     ROBOT_LISTENER_API_VERSION = 2
     instance: Listener = None
 
-    def __init__(self, library: RobotDebug = None, is_library: bool = False):
+    def __init__(self, *options, library: RobotDebug = None, is_library: bool = False):
+        """Options can be given as listener arguments in the form ``name=value``.
+
+        - ``breakpoint=<file>:<line>`` or ``breakpoint=<keyword name>`` sets a breakpoint,
+          optionally followed by ``if <condition>`` and ``after <n> hits``.
+          Use ``;`` as argument separator if the source contains a colon:
+          ``--listener "RobotDebug.Listener;breakpoint=login.robot:42"``
+        - ``profile`` profiles keywords and prints the hot keywords at the end:
+          ``--listener RobotDebug.Listener:profile``
+        - ``flamegraph=<file>`` profiles keywords and writes their call stacks weighted
+          by self time to ``<file>`` at the end, in the collapsed format of flame graph tools.
+        - ``prewarm`` builds the keyword catalog and completion of every suite in a
+          background thread when the suite starts, so the first prompt opens at once.
+        """
         Listener.instance = self
         self.library = library or RobotDebug(cli_listener=self)
-        self.source_files = {}
         self.new_error = True
         self.errormessage = {}
-        self.mutings = []
         self.is_library = is_library
-        self.keyword_layer = 0
+        self.keyword_stack = []
         self.last_keyword_layer = 1
-        self.step_mode: StepMode = StepMode.CONTINUE
+        self.breakpoints = BreakpointTable()
+        self.profiler = KeywordProfiler()
+        self.prewarm = False
+        self._idle = True
+        self._step_mode: StepMode = StepMode.CONTINUE
+        for option in options:
+            self._set_option(option)
+
+    def _set_option(self, option: str):
+        name, _, value = option.partition("=")
+        name = name.strip().lower()
+        if name == "breakpoint":
+            self.add_breakpoint(value)
+        elif name == "profile" and not value:
+            self.set_profiling(True)
+        elif name == "flamegraph" and value:
+            self.profiler.flamegraph = value
+            self.set_profiling(True)
+        elif name == "prewarm" and not value:
+            self.prewarm = True
+        else:
+            raise ValueError(f"Unknown option '{option}' for RobotDebug.Listener.")
+
+    @property
+    def step_mode(self) -> StepMode:
+        return self._step_mode
+
+    @step_mode.setter
+    def step_mode(self, step_mode: StepMode):
+        self._step_mode = step_mode
+        self._update_idle()
+
+    @property
+    def keyword_layer(self) -> int:
+        return len(self.keyword_stack)
+
+    @property
+    def current_keyword(self):
+        """Attributes of the innermost running keyword."""
+        return self.keyword_stack[-1] if self.keyword_stack else None
+
+    def _update_idle(self):
+        """Precompute whether ``start_keyword`` has anything to do at all.
+
+        While idle, the listener only tracks the keyword stack. Everything
+        else, like source lookups, is skipped.
+        """
+        self._idle = not self.profiler.enabled and (
+            self._step_mode == StepMode.STOP
+            or (self._step_mode == StepMode.CONTINUE and not self.breakpoints)
+        )
 
-    def start_keyword(self, name, attrs):
-        if self.step_mode == StepMode.STOP:
-            return
-        self.keyword_layer += 1
-        if attrs["kwname"] in MUTING_KEYWORDS:
-            self.mutings.append(attrs["kwname"])
+    def set_profiling(self, enabled: bool):
+        self.profiler.enabled = enabled
+        if not enabled:
+            self.profiler.drop_open_keywords()
+        self._update_idle()
 
-        path = attrs["source"]
-        if path and Path(path).exists() and path not in self.source_files:
-            self.source_files[path] = Path(path).open().readlines()  # noqa: SIM115
-        lineno = attrs["lineno"]
-        self.library.current_source_path = path
-        self.library.current_source_line = lineno
+    def add_breakpoint(self, spec: str) -> Breakpoint:
+        breakpoint_ = self.breakpoints.add(spec)
+        self._update_idle()
+        return breakpoint_
+
+    def remove_breakpoint(self, number: int) -> Breakpoint:
+        breakpoint_ = self.breakpoints.remove(number)
+        self._update_idle()
+        return breakpoint_
+
+    def clear_breakpoints(self):
+        self.breakpoints.clear()
+        self._update_idle()
+
+    def start_suite(self, name, attrs):
+        if self.profiler.enabled:
+            self.profiler.start_scope(name)
+        if self.prewarm:
+            prewarm_completion(ReplCmd if self.library.is_repl else DebugCmd, get_libs())
+
+    def end_suite(self, name, attrs):
+        if self.profiler.enabled:
+            self.profiler.end_scope()
+
+    def start_test(self, name, attrs):
+        if self.profiler.enabled:
+            self.profiler.start_scope(name)
+
+    def end_test(self, name, attrs):
+        if self.profiler.enabled:
+            self.profiler.end_scope()
 
-        if (
-            self.step_mode == StepMode.CONTINUE
-            or (self.step_mode == StepMode.OVER and self.last_keyword_layer < self.keyword_layer)
-            or (self.step_mode == StepMode.OUT and self.last_keyword_layer <= self.keyword_layer)
+    def start_keyword(self, name, attrs):
+        self.keyword_stack.append(attrs)
+        if self._idle:
+            return
+        if self.profiler.enabled:
+            self.profiler.start_keyword(name, attrs)
+        if self._step_mode == StepMode.STOP:
+            return
+        breakpoint_ = self.breakpoints.match(name, attrs)
+        if breakpoint_ and not breakpoint_.should_stop():
+            breakpoint_ = None
+        keyword_layer = len(self.keyword_stack)
+        if not breakpoint_ and (
+            self._step_mode == StepMode.CONTINUE
+            or (self._step_mode == StepMode.OVER and self.last_keyword_layer < keyword_layer)
+            or (self._step_mode == StepMode.OUT and self.last_keyword_layer <= keyword_layer)
         ):
             return
-        self.last_keyword_layer = self.keyword_layer
+        self.last_keyword_layer = keyword_layer
 
-        print_output(
-            "", f"{Path(path).relative_to(Path.cwd())}:{lineno}", style=LOW_VISIBILITY_STYLE
-        )
-        line = self.source_files[path][lineno - 1]
-        print_output(f"{lineno} ->", line.rstrip())
+        path = attrs["source"]
+        lineno = attrs["lineno"]
+        self.library._update_source_position(attrs)
+        if breakpoint_:
+            print_output(">>>>>", str(breakpoint_))
+            if breakpoint_.error:
+                print_error("! Condition error:", breakpoint_.error)
+        step_renderer.print_step(path, lineno)
 
         # callback debug interface
         self.library._debug(muted=True)
@@ -71,16 +176,19 @@ class Listener:
             self.errormessage = message
 
     def end_keyword(self, name, attrs):
-        self.keyword_layer -= 1
+        if self.keyword_stack:  # library listeners may miss the start of the importing keyword
+            self.keyword_stack.pop()
+        if self._idle and self.is_library:
+            return
+        if self.profiler.enabled:
+            self.profiler.end_keyword(name, attrs)
         if attrs["status"] == "PASS":
             self.new_error = True
-        if self.mutings and attrs["kwname"] == self.mutings[-1]:
-            self.mutings.pop()
-        if (
+        elif (
             attrs["status"] == "FAIL"
             and self.new_error
-            and not self.mutings
             and not self.is_library
+            and not self._is_muted()
         ):
             print_output(
                 self.errormessage.get("level", ""),
@@ -88,6 +196,7 @@ class Listener:
                 style=ERROR_STYLE,
             )
             self.library.show_intro = True
+            self.library._update_source_position(attrs)
             self.library._debug(muted=True)
             self.new_error = False
         if is_step_mode():
@@ -95,6 +204,19 @@ class Listener:
                 val = BuiltIn().get_variable_value(var_name)
                 print_output("#", f"{var_name} = {val!r}")
 
+    def close(self):
+        if self.profiler.flamegraph:
+            self.profiler.write_folded_stacks(self.profiler.flamegraph)
+            print_output(">>>>>", f"Folded call stacks written to {self.profiler.flamegraph}")
+        elif self.profiler.stats:
+            print_output(">>>>>", "Hot keywords ranked by self time:")
+            for line in self.profiler.report():
+                print_output("", line)
+
+    def _is_muted(self):
+        """Whether a running keyword expects or ignores failures of its children."""
+        return any(keyword["kwname"] in MUTING_KEYWORDS for keyword in self.keyword_stack)
+
 
 class RobotDebug:
     """Debug Library for RobotFramework."""
@@ -111,17 +233,25 @@ class RobotDebug:
     def __init__(self, **kwargs):
         self.cli_listener = kwargs.get("cli_listener", False)
         self.ROBOT_LIBRARY_LISTENER = (
-            Listener(self, is_library=True)
+            Listener(library=self, is_library=True)
             if not self.cli_listener and not Listener.instance
             else None
         )
         self.listener = self.cli_listener or Listener.instance or self.ROBOT_LIBRARY_LISTENER
+        if is_truthy(kwargs.get("prewarm", False)):
+            self.listener.prewarm = True
         self.show_intro = True
         self.is_repl = kwargs.get("repl", False)
         self.debug_cmd = None
         self.current_source_line = 0
         self.current_source_path = ""
 
+    def _update_source_position(self, keyword_attrs):
+        """Take the source position from listener attributes of a keyword."""
+        if keyword_attrs:
+            self.current_source_path = keyword_attrs["source"]
+            self.current_source_line = keyword_attrs["lineno"]
+
     def Library(self, name, *args):  # noqa: N802
         """Imports a library with the given name and optional arguments.
 
@@ -141,6 +271,7 @@ class RobotDebug:
         | Import Library | path/Lib.py | arg1 | named=arg2 | AS | Custom |
         """
         BuiltIn().import_library(name, *args)
+        invalidate_lib_keywords()
 
     def Resource(self, path):  # noqa: N802
         """Imports a resource file with the given path.
@@ -154,9 +285,12 @@ class RobotDebug:
         | Import Resource | path/resource.txt |
         | Import Resource | path/../resources/resource.html |
         | Import Resource | found_from_pythonpath.robot |
-        """
 
+        A resource file that was modified since it was imported is read again.
+        """
+        reload_resource(path)
         BuiltIn().import_resource(path)
+        invalidate_lib_keywords()
 
     def Variables(self, path, *args):  # noqa: N802
         """Imports a variable file with the given path and optional arguments.
@@ -181,6 +315,7 @@ class RobotDebug:
 
         Keywords separated by two space or one tab, and Ctrl-D to exit.
         """
+        self._update_source_position(self.listener.current_keyword)
         # re-wire stdout so that we can use the cmd module and have readline
         # support
         return self._debug()
@@ -188,29 +323,32 @@ class RobotDebug:
     def _debug(self, muted: bool = False):
         if self.listener.step_mode == StepMode.STOP:
             return
-        old_stdout = sys.stdout
-        sys.stdout = sys.__stdout__
-        try:
-            self.debug_cmd = ReplCmd(self) if self.is_repl else DebugCmd(self)
-            if not is_step_mode() and not muted:
-                print_output(">>>>>", "Enter interactive shell")
-            if self.show_intro:
-                self.show_intro = False
-                if self.cli_listener:
-                    print_output(
-                        "File: ",
-                        str(Path(self.current_source_path).relative_to(Path.cwd())) or "unknown",
-                    )
-                    self.debug_cmd.do_longlist("")
-                    intro = "Execution interrupted by RobotDebug. Type 'help' for more information."
+        with self.listener.profiler.paused():
+            old_stdout = sys.stdout
+            sys.stdout = sys.__stdout__
+            try:
+                self.debug_cmd = ReplCmd(self) if self.is_repl else DebugCmd(self)
+                if not is_step_mode() and not muted:
+                    print_output(">>>>>", "Enter interactive shell")
+                if self.show_intro:
+                    self.show_intro = False
+                    if self.cli_listener:
+                        print_output(
+                            "File: ",
+                            step_renderer.relative_path(self.current_source_path) or "unknown",
+                        )
+                        self.debug_cmd.do_longlist("")
+                        intro = (
+                            "Execution interrupted by RobotDebug. Type 'help' for more information."
+                        )
+                    else:
+                        intro = None
                 else:
-                    intro = None
-            else:
-                intro = ""
-            self.debug_cmd.cmdloop(intro=intro)
-
-            if not is_step_mode() and not muted:
-                print_output("<<<<<", "Exit shell.")
-        finally:
-            # put stdout back where it was
-            sys.stdout = old_stdout
+                    intro = ""
+                self.debug_cmd.cmdloop(intro=intro)
+
+                if not is_step_mode() and not muted:
+                    print_output("<<<<<", "Exit shell.")
+            finally:
+                # put stdout back where it was
+                sys.stdout = old_stdout
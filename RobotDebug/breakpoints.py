@@ -0,0 +1,259 @@
+import builtins
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from robot.running.context import EXECUTION_CONTEXTS
+
+from .globals import KEYWORD_SEP
+from .robotkeyword import normalize_kw
+
+LOCATION_MATCHER = re.compile(r"(?P<source>.+):(?P<lineno>\d+)")
+SPEC_OPTIONS = r"(?:{sep}if\s+(?P<condition>.+?))?(?:{sep}after\s+(?P<after>\d+)\s+hits?)?"
+LOCATION_SPEC_MATCHER = re.compile(r"(?P<target>.+?:\d+)" + SPEC_OPTIONS.format(sep=r"\s+"))
+KEYWORD_SPEC_MATCHER = re.compile(r"(?P<target>.+?)" + SPEC_OPTIONS.format(sep=r"(?:[ \t]{2,}|\t)"))
+VARIABLE_MATCHER = re.compile(r"[$@&]\{(?P<braced>[^}]+)}|\$(?P<bare>[_a-zA-Z]\w*)")
+EXTENDED_MATCHER = re.compile(r"[.\[]")
+
+
+def normalize_source(source: str) -> str:
+    if source.startswith(os.pardir):
+        source = str(Path(source).absolute())
+    return os.path.normcase(os.path.normpath(source))
+
+
+def get_current_variables():
+    """Variable store of the currently running keyword or test."""
+    return EXECUTION_CONTEXTS.current.variables.current.store
+
+
+class Condition:
+    """Breakpoint condition compiled once to a Python code object.
+
+    Robot variables like ``${retry}`` or ``$retry`` are replaced by local
+    names when the condition is created. Evaluating it only looks up these
+    variables and runs the code object, without parsing the expression again.
+    Variables are used as their Python objects, like ``$var`` in ``Evaluate``.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.variables: Dict[str, str] = {}
+        self._local_names: Dict[str, str] = {}
+        self.code = compile(
+            VARIABLE_MATCHER.sub(self._replace_variable, expression),
+            "<breakpoint condition>",
+            "eval",
+        )
+        self.globals = {"__builtins__": builtins}
+
+    def _replace_variable(self, match) -> str:
+        name = match.group("bare") or match.group("braced")
+        extended = EXTENDED_MATCHER.search(name) if match.group("braced") else None
+        suffix = ""
+        if extended:
+            name, suffix = name[: extended.start()], name[extended.start() :]
+        normalized = normalize_kw(name)
+        local_name = self._local_names.get(normalized)
+        if not local_name:
+            local_name = self._local_names[normalized] = f"RF_VAR_{len(self._local_names)}"
+            self.variables[local_name] = name
+        return f"{local_name}{suffix}"
+
+    def evaluate(self, variables=None) -> bool:
+        """Evaluate the condition with the given or the current variable store."""
+        if variables is None:
+            variables = get_current_variables()
+        values = {local_name: variables[name] for local_name, name in self.variables.items()}
+        return bool(eval(self.code, self.globals, values))
+
+    def __str__(self):
+        return self.expression
+
+
+class Breakpoint:
+    """A place where the listener interrupts the execution.
+
+    Either a ``source``/``lineno`` location or a ``keyword`` name is set.
+    An optional ``condition`` has to be true and the breakpoint has to be
+    hit more than ``after`` times before the execution stops.
+    """
+
+    def __init__(
+        self,
+        number: int,
+        source=None,
+        lineno=None,
+        keyword=None,
+        *,
+        condition: Optional[Condition] = None,
+        after: int = 0,
+    ):
+        self.number = number
+        self.source = source
+        self.lineno = lineno
+        self.keyword = keyword
+        self.condition = condition
+        self.after = after
+        self.normalized = normalize_source(source) if source else normalize_kw(keyword)
+        self.hits = 0
+        self.error = None
+        self._matched_sources: Dict[str, bool] = {}
+
+    @property
+    def location(self) -> str:
+        return f"{self.source}:{self.lineno}" if self.source else self.keyword
+
+    def matches_source(self, source: str) -> bool:
+        """Match absolute paths exactly and relative ones against the end of ``source``."""
+        try:
+            return self._matched_sources[source]
+        except KeyError:
+            matched = self._matched_sources[source] = self._matches_source(source)
+            return matched
+
+    def _matches_source(self, source: str) -> bool:
+        if not source:
+            return False
+        source = normalize_source(source)
+        if Path(self.normalized).is_absolute():
+            return source == self.normalized
+        return source == self.normalized or source.endswith(os.sep + self.normalized)
+
+    def should_stop(self, variables=None) -> bool:
+        """Count a hit if the condition is true and tell if the execution should stop.
+
+        A condition that can not be evaluated stops the execution and keeps
+        the reason in ``error``.
+        """
+        self.error = None
+        if self.condition:
+            try:
+                if not self.condition.evaluate(variables):
+                    return False
+            except Exception as err:
+                self.error = f"{type(err).__name__}: {err}"
+                return True
+        self.hits += 1
+        return self.hits > self.after
+
+    @property
+    def spec(self) -> str:
+        spec = self.location
+        if self.condition:
+            spec += f" if {self.condition}"
+        if self.after:
+            spec += f" after {self.after} hits"
+        return spec
+
+    def __str__(self):
+        return f"Breakpoint {self.number} at {self.spec}"
+
+
+class BreakpointTable:
+    """Breakpoints indexed for a single hash lookup per started keyword.
+
+    Location breakpoints are indexed by line number, because that is an
+    integer the listener gets for free. Only if a breakpoint exists on the
+    line, the source path is compared. Keyword breakpoints are resolved once
+    per full keyword name and remembered.
+    """
+
+    def __init__(self):
+        self.breakpoints: Dict[int, Breakpoint] = {}
+        self._lines: Dict[int, List[Breakpoint]] = {}
+        self._keywords: Dict[str, Breakpoint] = {}
+        self._resolved_keywords: Dict[str, Optional[Breakpoint]] = {}
+        self._next_number = 1
+
+    def __bool__(self):
+        return bool(self.breakpoints)
+
+    def __iter__(self):
+        return iter(self.breakpoints.values())
+
+    def __len__(self):
+        return len(self.breakpoints)
+
+    def add(self, spec: str) -> Breakpoint:
+        """Add a breakpoint from a spec like ``<file>:<line> [if <condition>] [after <n> hits]``.
+
+        Instead of ``<file>:<line>`` a keyword name can be used. A breakpoint
+        at a keyword that already has one replaces it. Keyword names
+        may contain ``if`` and ``after`` themselves, so after a keyword name
+        the lowercase ``if`` and ``after`` must follow a Robot separator of
+        two or more spaces or a tab, like ``Run Keyword If    if $i > 3``.
+        """
+        spec = spec.strip()
+        if not spec:
+            raise ValueError("Breakpoint needs a <file>:<line> or a keyword name.")
+        parts = LOCATION_SPEC_MATCHER.fullmatch(spec) or KEYWORD_SPEC_MATCHER.fullmatch(spec)
+        if not parts:
+            raise ValueError(f"Invalid breakpoint: {spec}")
+        target = parts.group("target").strip()
+        if KEYWORD_SEP.search(target):
+            raise ValueError(
+                f"Unexpected separator in keyword name '{target}', "
+                "use 'if <condition>' or 'after <n> hits' after it."
+            )
+        options = {
+            "condition": Condition(parts.group("condition")) if parts.group("condition") else None,
+            "after": int(parts.group("after") or 0),
+        }
+        location = LOCATION_MATCHER.fullmatch(target)
+        if location:
+            point = Breakpoint(
+                self._next_number,
+                source=location.group("source").strip(),
+                lineno=int(location.group("lineno")),
+                **options,
+            )
+            self._lines.setdefault(point.lineno, []).append(point)
+        else:
+            point = Breakpoint(self._next_number, keyword=target, **options)
+            replaced = self._keywords.get(point.normalized)
+            if replaced:
+                del self.breakpoints[replaced.number]
+            self._keywords[point.normalized] = point
+            self._resolved_keywords.clear()
+        self.breakpoints[point.number] = point
+        self._next_number += 1
+        return point
+
+    def remove(self, number: int) -> Breakpoint:
+        point = self.breakpoints.pop(number)
+        if point.source:
+            line = self._lines[point.lineno]
+            line.remove(point)
+            if not line:
+                del self._lines[point.lineno]
+        else:
+            if self._keywords.get(point.normalized) is point:
+                del self._keywords[point.normalized]
+            self._resolved_keywords.clear()
+        return point
+
+    def clear(self):
+        self.breakpoints.clear()
+        self._lines.clear()
+        self._keywords.clear()
+        self._resolved_keywords.clear()
+
+    def match(self, name: str, attrs: dict) -> Optional[Breakpoint]:
+        """Return the breakpoint for a started keyword, if there is any."""
+        breakpoints = self._lines.get(attrs["lineno"])
+        if breakpoints:
+            for point in breakpoints:
+                if point.matches_source(attrs["source"]):
+                    return point
+        if self._keywords:
+            try:
+                return self._resolved_keywords[name]
+            except KeyError:
+                point = self._keywords.get(normalize_kw(name)) or self._keywords.get(
+                    normalize_kw(attrs["kwname"])
+                )
+                self._resolved_keywords[name] = point
+                return point
+        return None
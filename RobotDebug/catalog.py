@@ -0,0 +1,138 @@
+"""Catalog of the imported libraries and keywords shared by all completers."""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .keywordcache import KeywordSpec, keyword_cache
+from .robotkeyword import get_lib_keywords, normalize_kw
+from .robotlib import get_libs
+
+Command = Tuple[str, str, str]
+
+
+class PrefixIndex:
+    """Names sorted by their normalized form for prefix searches with bisect.
+
+    Dotted names like ``BuiltIn.Log`` and undotted ones like ``Log`` are kept
+    apart, because a search text with a dot only matches dotted names and
+    one without a dot only undotted names.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        dotted, undotted = {}, {}
+        for name in names:
+            (dotted if "." in name else undotted)[normalize_kw(name)] = name
+        self._dotted = self._sorted(dotted)
+        self._undotted = self._sorted(undotted)
+
+    @staticmethod
+    def _sorted(names: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        keys = sorted(names)
+        return keys, [names[key] for key in keys]
+
+    def __len__(self):
+        return len(self._dotted[0]) + len(self._undotted[0])
+
+    def search(self, text: str) -> Iterator[str]:
+        """Yield the names whose normalized form starts with the normalized ``text``."""
+        prefix = normalize_kw(text)
+        keys, names = self._dotted if "." in text else self._undotted
+        for index in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[index].startswith(prefix):
+                return
+            yield names[index]
+
+
+class LibraryEntry:
+    """Keywords and completion commands of one imported library or resource."""
+
+    __slots__ = ("commands", "keywords", "lib")
+
+    def __init__(self, lib):
+        self.lib = lib
+        self.keywords: List[KeywordSpec] = list(get_lib_keywords(lib))
+        self.commands: List[Command] = []
+        for keyword in self.keywords:
+            self.commands.append(
+                (f"{keyword.parent.name}.{keyword.name}", keyword.name, f"({keyword.args})")
+            )
+            self.commands.append(
+                (keyword.name, keyword.name, f"({keyword.args}) [{keyword.parent.name}]")
+            )
+
+    @property
+    def command(self) -> Command:
+        version = self.lib.version if hasattr(self.lib, "version") else ""
+        return self.lib.name, self.lib.name, f"Library: {self.lib.name} {version}"
+
+
+class KeywordCatalog:
+    """Libraries, keywords and completion commands of the current namespace.
+
+    The catalog is refreshed before every prompt. A refresh only compares the
+    identities of the imported libraries and resources with the last one and
+    builds the entries of the newly imported ones. ``generation`` is increased
+    on every change, so structures derived from the catalog know when they
+    have to be rebuilt. Specs that the keyword cache rebuilt in the background
+    replace the stale ones on the next refresh.
+
+    Refreshes are serialized, so a catalog pre-warmed in a background thread
+    is handed over to the prompt once it is complete.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.libs = []
+        self.keywords: List[KeywordSpec] = []
+        self.keywords_catalog: Dict[str, KeywordSpec] = {}
+        self.commands: List[Command] = []
+        self._entries: Dict[int, LibraryEntry] = {}
+        self._signature = None
+        self._cache_updates = keyword_cache.updates
+        self._lock = threading.RLock()
+
+    def refresh(self, libs=None) -> bool:
+        """Update the catalog if libraries or resources were imported since the last refresh.
+
+        ``libs`` defaults to the libraries and resources of the current namespace.
+        """
+        if libs is None:
+            libs = get_libs()
+        with self._lock:
+            return self._refresh(libs)
+
+    def _refresh(self, libs) -> bool:
+        if self._cache_updates != keyword_cache.updates:
+            self._cache_updates = keyword_cache.updates
+            self.invalidate()
+        signature = tuple(id(lib) for lib in libs)
+        if signature == self._signature:
+            return False
+        entries = {}
+        for lib in libs:
+            entry = self._entries.get(id(lib))
+            entries[id(lib)] = entry if entry and entry.lib is lib else LibraryEntry(lib)
+        self._entries = entries
+        self._signature = signature
+        self.libs = libs
+        self.keywords = [keyword for entry in entries.values() for keyword in entry.keywords]
+        self.keywords_catalog = {}
+        for keyword in self.keywords:
+            self.keywords_catalog[normalize_kw(keyword.name)] = keyword
+            self.keywords_catalog[
+                f"{normalize_kw(keyword.parent.name)}.{normalize_kw(keyword.name)}"
+            ] = keyword
+        self.commands = [entry.command for entry in entries.values()]
+        self.commands.extend(command for entry in entries.values() for command in entry.commands)
+        self.generation += 1
+        return True
+
+    def invalidate(self):
+        """Rebuild all entries on the next refresh."""
+        with self._lock:
+            self._entries.clear()
+            self._signature = None
+
+
+keyword_catalog = KeywordCatalog()
@@ -1,15 +1,24 @@
+import heapq
 import re
-from typing import Optional, Union
+import threading
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.document import Document
+from prompt_toolkit.history import History
 from robot.libraries.BuiltIn import BuiltIn
 from robot.parsing.parser.parser import _tokens_to_statements
+from robot.variables.search import is_assign
 
+from .catalog import KeywordCatalog, PrefixIndex
 from .globals import IS_RF_7, KEYWORD_SEP
-from .lexer import get_robot_token, get_variable_token
+from .history import get_history_index
+from .lexer import get_variable_token, token_cache
+from .previews import variable_previews
 from .prompttoolkitcmd import PromptToolkitCmd
 from .robotkeyword import normalize_kw
 from .styles import _get_style_completions
@@ -90,58 +99,230 @@ class StatementInformation:
             self.previous_token = token
 
 
+MAX_COMPLETIONS = 50
+PREFIX_SCORE = 100
+FIRST_WORD_SCORE = 2
+DOC_WORD_SCORE, LIB_WORD_SCORE, SUBSEQUENCE_SCORE, INITIALS_SCORE = 1, 3, 5, 6
+WORD_PREFIX_SCORE, WORD_SCORE = 8, 10
+WORD_MATCHER = re.compile(r"[^\W_]+")
+FIELDS = ("name", "lib", "doc")
+
+
+def _is_subsequence(text: str, word: str) -> bool:
+    chars = iter(word)
+    return all(char in chars for char in text)
+
+
+class _FuzzyTable:
+    """Entries sorted by normalized name with inverted indexes of their words."""
+
+    def __init__(self, entries: List[Tuple[str, str, str, str]]):
+        entries.sort(key=lambda entry: normalize_kw(entry[1]))
+        self.names = [name for name, _, _, _ in entries]
+        self.normalized = [normalize_kw(keyword) for _, keyword, _, _ in entries]
+        self.libs = [normalize_kw(lib) for _, _, lib, _ in entries]
+        self.base = [-len(keyword) / 1000 for _, keyword, _, _ in entries]  # shorter names win ties
+        self.postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in FIELDS}
+        initials = []
+        for index, (_, keyword, lib, doc) in enumerate(entries):
+            words = WORD_MATCHER.findall(keyword.lower())
+            initials.append(("".join(word[0] for word in words), index))
+            for field, text in [("name", keyword), ("lib", lib), ("doc", doc)]:
+                postings = self.postings[field]
+                for word in set(words if field == "name" else WORD_MATCHER.findall(text.lower())):
+                    postings.setdefault(word, []).append(index)
+        initials.sort()
+        self.initials = [value for value, _ in initials]
+        self.initials_ids = [index for _, index in initials]
+        self.vocabulary: Dict[str, Dict[str, List[str]]] = {field: {} for field in FIELDS}
+        for field, postings in self.postings.items():
+            for word in postings:
+                self.vocabulary[field].setdefault(word[0], []).append(word)
+
+    def _matching(self, field: str, word: str, matches) -> Iterator[List[int]]:
+        """Postings of the words of ``field`` that start like ``word`` and ``matches`` it."""
+        postings = self.postings[field]
+        for other in self.vocabulary[field].get(word[0], ()):
+            if matches(other):
+                yield postings[other]
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> range:
+        return range(bisect_left(keys, prefix), bisect_left(keys, f"{prefix}\uffff"))
+
+    def word_scores(self, word: str) -> Dict[int, int]:
+        """Best score of every entry matching the query ``word``.
+
+        Lower scores are applied first and overwritten by higher ones.
+        """
+        scores = {}
+        for field, score, matches in [
+            ("doc", DOC_WORD_SCORE, lambda other: other.startswith(word)),
+            ("lib", LIB_WORD_SCORE, lambda other: other.startswith(word)),
+            ("name", SUBSEQUENCE_SCORE, lambda other: _is_subsequence(word, other)),
+        ]:
+            for postings in self._matching(field, word, matches):
+                scores.update(dict.fromkeys(postings, score))
+        if len(word) > 1:
+            ids = self.initials_ids
+            scores.update(
+                (ids[index], INITIALS_SCORE) for index in self._prefix_range(self.initials, word)
+            )
+        for postings in self._matching("name", word, lambda other: other.startswith(word)):
+            scores.update(dict.fromkeys(postings, WORD_PREFIX_SCORE))
+        scores.update(dict.fromkeys(self.postings["name"].get(word, ()), WORD_SCORE))
+        return scores
+
+    def search(self, words: List[str], normalized: str, lib: str, limit: int) -> List[str]:
+        scores = None
+        for word in words:
+            matches = self.word_scores(word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    index: scores[index] + matches[index] for index in scores if index in matches
+                }
+            if not scores:
+                return []
+        for index in self._prefix_range(self.normalized, normalize_kw(words[0])):
+            if index in scores:
+                scores[index] += FIRST_WORD_SCORE
+        for index in self._prefix_range(self.normalized, normalized):
+            if index in scores:
+                scores[index] += PREFIX_SCORE
+        if lib:
+            scores = {
+                index: score for index, score in scores.items() if self.libs[index].startswith(lib)
+            }
+        base = self.base
+        best = heapq.nlargest(limit, scores, key=lambda index: scores[index] + base[index])
+        return [self.names[index] for index in best]
+
+
+class FuzzyIndex:
+    """Ranks names by how well their words, library and short doc match a query.
+
+    A query word matches a word of the name if it is its prefix or a
+    subsequence of it, e.g. ``btn`` matches ``Button``. It also matches the
+    initials of the name, like ``sbe`` for ``Should Be Equal``, and with lower
+    scores a word of the library name or of the short doc. All query words
+    have to match. The words of all entries are indexed in advance, so a
+    query only looks at the entries sharing words with it.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str, str]] = ()):
+        dotted, undotted = [], []
+        for entry in entries:
+            (dotted if "." in entry[0] else undotted).append(entry)
+        self._dotted = _FuzzyTable(dotted)
+        self._undotted = _FuzzyTable(undotted)
+
+    def search(self, text: str, limit: int = MAX_COMPLETIONS) -> List[str]:
+        """Return the ``limit`` best matches of ``(name, keyword, library, doc)`` entries."""
+        lib = ""
+        table = self._undotted
+        if "." in text:
+            lib, _, text = text.rpartition(".")
+            table = self._dotted
+        words = WORD_MATCHER.findall(text.lower())
+        if not words:
+            return []
+        return table.search(words, normalize_kw(text), normalize_kw(lib), limit)
+
+
+class CompletionIndex:
+    """Completion texts and search indexes of the shell commands and one catalog generation."""
+
+    __slots__ = ("display_metas", "displays", "fuzzy_index", "generation", "index", "names")
+
+    def __init__(self, catalog: KeywordCatalog, helps):
+        self.generation = catalog.generation
+        self.names = []
+        self.displays = {}
+        self.display_metas = {}
+        for name, display, display_meta in self.get_commands(catalog, helps):
+            self.names.append(name)
+            self.displays[name] = display
+            self.display_metas[name] = display_meta
+        self.index = PrefixIndex(self.names)
+        self.fuzzy_index = FuzzyIndex(self.get_fuzzy_entries(catalog, helps))
+
+    @staticmethod
+    def get_commands(catalog: KeywordCatalog, helps):
+        commands = [(cmd_name, cmd_name, f"DEBUG command: {doc}") for cmd_name, doc in helps]
+        commands.extend(catalog.commands)
+        return commands
+
+    @staticmethod
+    def get_fuzzy_entries(catalog: KeywordCatalog, helps):
+        for cmd_name, doc in helps:
+            yield cmd_name, cmd_name, "", doc.split("\n", 1)[0]
+        for lib in catalog.libs:
+            yield lib.name, lib.name, "", ""
+        for keyword in catalog.keywords:
+            lib, doc = keyword.parent.name, keyword.short_doc
+            yield f"{lib}.{keyword.name}", keyword.name, lib, doc
+            yield keyword.name, keyword.name, lib, doc
+
+
+_completion_indexes: Dict[Tuple[Tuple[str, str], ...], CompletionIndex] = {}
+_completion_indexes_lock = threading.Lock()
+
+
+def get_completion_index(catalog: KeywordCatalog, helps) -> CompletionIndex:
+    """The completion index of the current catalog generation, built once for all prompts.
+
+    It is shared between threads, a caller waits while another one builds it.
+    """
+    key = tuple(helps)
+    with _completion_indexes_lock:
+        completion_index = _completion_indexes.get(key)
+        if not completion_index or completion_index.generation != catalog.generation:
+            completion_index = _completion_indexes[key] = CompletionIndex(catalog, helps)
+        return completion_index
+
+
 class CmdCompleter(Completer):
     """Completer for debug shell."""
 
-    def __init__(self, libs, keywords, helps, cmd_repl: Optional[PromptToolkitCmd] = None):
+    def __init__(self, catalog: KeywordCatalog, helps, cmd_repl: Optional[PromptToolkitCmd] = None):
+        self.catalog = catalog
         self.names = []
         self.displays = {}
         self.display_metas = {}
+        self.index = PrefixIndex()
+        self.fuzzy_index = FuzzyIndex()
         self.helps = helps
-        self.libs = libs
-        self.keywords = list(keywords)
-        self.keywords_catalog = {}
-        for keyword in self.keywords:
-            self.keywords_catalog[normalize_kw(keyword.name)] = keyword
-            self.keywords_catalog[
-                f"{normalize_kw(keyword.parent.name)}.{normalize_kw(keyword.name)}"
-            ] = keyword
         self.current_statement = None
-        for name, display, display_meta in self.get_commands():
-            self.names.append(name)
-            self.displays[name] = display
-            self.display_metas[name] = display_meta
         self.cmd_repl = cmd_repl
+        self._generation = None
 
-    def get_commands(self):
-        commands = [(cmd_name, cmd_name, f"DEBUG command: {doc}") for cmd_name, doc in self.helps]
+    def update(self):
+        """Take over the commands of the catalog if it changed since the last update.
 
-        for lib in self.libs:
-            commands.append(
-                (
-                    lib.name,
-                    lib.name,
-                    f"Library: {lib.name} {lib.version if hasattr(lib, 'version') else ''}",
-                )
-            )
+        Completions run in a background thread, so this is called before the prompt.
+        """
+        variable_previews.next_epoch()
+        if self._generation == self.catalog.generation:
+            return
+        completion_index = get_completion_index(self.catalog, self.helps)
+        self.names = completion_index.names
+        self.displays = completion_index.displays
+        self.display_metas = completion_index.display_metas
+        self.index = completion_index.index
+        self.fuzzy_index = completion_index.fuzzy_index
+        self._generation = completion_index.generation
 
-        for keyword in self.keywords:
-            name = f"{keyword.parent.name}.{keyword.name}"
-            commands.append(
-                (
-                    name,
-                    keyword.name,
-                    f"({keyword.args})",
-                )
+    def get_command_names(self, text):
+        """Names starting with ``text``, followed by the best fuzzy matches, if there are few."""
+        names = list(islice(self.index.search(text), MAX_COMPLETIONS))
+        if len(names) < MAX_COMPLETIONS:
+            found = set(names)
+            names.extend(
+                name for name in self.fuzzy_index.search(text, MAX_COMPLETIONS) if name not in found
             )
-            commands.append(
-                (
-                    keyword.name,
-                    keyword.name,
-                    f"({keyword.args}) [{keyword.parent.name}]",
-                )
-            )
-        return commands
+        return names[:MAX_COMPLETIONS]
 
     def _get_command_completions(self, text):
         suffix_len = len(text) - len(text.rstrip())
@@ -152,11 +333,7 @@ class CmdCompleter(Completer):
                 display=self.displays.get(name, ""),
                 display_meta=self.display_metas.get(name, ""),
             )
-            for name in self.names
-            if (
-                (("." not in name and "." not in text) or ("." in name and "." in text))
-                and normalize_kw(name).startswith(normalize_kw(text))
-            )
+            for name in self.get_command_names(text)
         )
 
     def _get_resource_completions(self, text):
@@ -176,7 +353,7 @@ class CmdCompleter(Completer):
         )
 
     def _get_argument_completer(self, text):
-        keyword = self.keywords_catalog.get(
+        keyword = self.catalog.keywords_catalog.get(
             normalize_kw(self.current_statement.statement.keyword), None
         )
         if keyword:
@@ -230,7 +407,7 @@ class CmdCompleter(Completer):
         text = document.current_line_before_cursor
         cursor_col = document.cursor_position_col
         cursor_row = document.cursor_position_row
-        token_list = list(get_robot_token(document.text))
+        token_list = token_cache.get(document.text).tokens
         statements = list(_tokens_to_statements(token_list, None))
         statement_info = StatementInformation(cursor_col, cursor_row, statements)
         self.current_statement = statement_info
@@ -349,14 +526,17 @@ class CmdCompleter(Completer):
         if token.type in ["ASSIGN", "VARIABLE"] or (
             token.type in ["KEYWORD", "ARGUMENT"] and re.fullmatch(r"[$&@]\{[^}]*}?", token.value)
         ):
+            variables = BuiltIn().get_variables()
+            variable_previews.retain(variables)
             yield from [
                 Completion(
                     var,
                     -cursor_pos,
                     display=var,
-                    display_meta=repr(val),
+                    # rendered by the menu only for the visible rows
+                    display_meta=lambda var=var, val=val: variable_previews.get(var, val),
                 )
-                for var, val in BuiltIn().get_variables().items()
+                for var, val in variables.items()
                 if normalize_kw(var[1:]).startswith(normalize_kw(token.value[1:cursor_pos]))
             ]
         elif token.type == "KEYWORD":
@@ -372,13 +552,44 @@ class CmdCompleter(Completer):
 
 
 class KeywordAutoSuggestion(AutoSuggest):
-    def __init__(self, completer: CmdCompleter):
+    """Suggests the rest of the current line from the history or of a keyword name.
+
+    The most recent history line starting with the current line wins.
+    Otherwise a keyword is suggested if the last cell is in the position of
+    a keyword. Both are looked up in prefix indexes instead of running the
+    completer, and the suggestion for the last text is remembered, because
+    it is requested again on every redraw.
+    """
+
+    def __init__(self, completer: CmdCompleter, history: Optional[History] = None):
         self.completer = completer
+        self.history = history
+        self._last = (None, None, None)
+
+    def reset(self):
+        """Forget the last suggestion, because the history might have changed."""
+        self._last = (None, None, None)
 
     def get_suggestion(self, buffer: Buffer, document: Document) -> Union[Suggestion, None]:
-        text = document.text
-        completions = [compl.text for compl in self.completer.get_completions(document, None)]
-        last_word = KEYWORD_SEP.split(text)[-1]
-        matches = [kw for kw in completions if kw.startswith(last_word)]
-        matches.extend([kw for kw in completions if kw.lower().startswith(last_word.lower())])
-        return Suggestion(matches[0][len(last_word) :] if matches else "")
+        text, index = document.text, self.completer.index
+        last_text, last_index, suggestion = self._last
+        if text != last_text or index is not last_index:
+            suggestion = Suggestion(self._suggest(text.rpartition("\n")[2], index))
+            self._last = (text, index, suggestion)
+        return suggestion
+
+    def _suggest(self, line: str, index: PrefixIndex) -> str:
+        if not line.strip():
+            return ""
+        history_line = get_history_index(self.history).find_line(line) if self.history else None
+        if history_line:
+            return history_line[len(line) :]
+        *cells, last_cell = KEYWORD_SEP.split(line)
+        if not last_cell or not all(
+            is_assign(cell, allow_assign_mark=True) for cell in cells if cell
+        ):
+            return ""
+        for name in islice(index.search(last_cell), MAX_COMPLETIONS):
+            if name.lower().startswith(last_cell.lower()):
+                return name[len(last_cell) :]
+        return ""
@@ -1,7 +1,13 @@
+import cProfile
 import difflib
+import io
 import os
+import pstats
+import re
+import statistics
+import threading
 import time
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from prompt_toolkit.shortcuts import clear
 from prompt_toolkit.styles import merge_styles
@@ -13,24 +19,26 @@ from robot.running.context import _ExecutionContext
 from robot.running.signalhandler import STOP_SIGNAL_MONITOR
 from robot.variables import is_variable
 
-from .cmdcompleter import CmdCompleter, KeywordAutoSuggestion
+from .catalog import keyword_catalog
+from .cmdcompleter import CmdCompleter, KeywordAutoSuggestion, get_completion_index
 from .globals import IS_RF_7, context
+from .history import get_history_index
 from .lexer import HEADER_MATCHER
+from .profiler import SORT_KEYS
 from .prompttoolkitcmd import PromptToolkitCmd
 from .robotkeyword import (
-    _get_assignments,
     _import_resource_from_string,
     find_keyword,
-    get_keywords,
     get_lib_keywords,
     get_test_body_from_string,
+    parsed_command_cache,
 )
 from .robotlib import (
     get_libraries,
-    get_libs,
     get_resources,
     match_libs,
 )
+from .search import get_search_index
 from .sourcelines import (
     print_source_lines,
     print_test_case_lines,
@@ -47,7 +55,12 @@ from .styles import (
     style_from_pygments_cls,
 )
 
-HISTORY_PATH = os.environ.get("RFDEBUG_HISTORY", "~/.rfdebug_history")
+HISTORY_PATH = os.environ.get("RFDEBUG_HISTORY", "~/.rfdebug_history.db")
+LEGACY_HISTORY_PATH = "~/.rfdebug_history"
+TIMEIT_OPTION = re.compile(r"-(?P<option>n|r)\s+(?P<value>\d+)\s+")
+TIMEIT_DEFAULT_REPEAT = 5
+CPROFILE_OPTION = re.compile(r"--(?P<option>sort|top|dump)\s+(?P<value>\S+)\s+")
+TIMEIT_MIN_ROUND_TIME = 0.2
 
 
 class ReplCmd(PromptToolkitCmd):
@@ -56,8 +69,12 @@ class ReplCmd(PromptToolkitCmd):
     prompt_style = DEBUG_PROMPT_STYLE
 
     def __init__(self, library):
-        super().__init__(library, history_path=HISTORY_PATH)
+        super().__init__(
+            library, history_path=HISTORY_PATH, legacy_history_path=LEGACY_HISTORY_PATH
+        )
         self.last_keyword_exec_time = 0
+        self.completer = None
+        self.auto_suggester = None
         self.listener = self.library.cli_listener or self.library.ROBOT_LIBRARY_LISTENER
 
     def do_continue(self, args):
@@ -90,10 +107,17 @@ Access https://github.com/imbus/robotframework-debug for more details.\
 
     def get_completer(self):
         """Get completer instance specified for robotframework."""
-        return CmdCompleter(get_libs(), get_keywords(), self.get_helps(), self)
+        keyword_catalog.refresh()
+        if not self.completer:
+            self.completer = CmdCompleter(keyword_catalog, self.get_helps(), self)
+        self.completer.update()
+        return self.completer
 
     def get_auto_suggester(self):
-        return KeywordAutoSuggestion(self.get_completer())
+        if not self.auto_suggester:
+            self.auto_suggester = KeywordAutoSuggestion(self.get_completer(), self.history)
+        self.auto_suggester.reset()
+        return self.auto_suggester
 
     def default(self, line):
         """Run RobotFramework keywords."""
@@ -101,13 +125,13 @@ Access https://github.com/imbus/robotframework-debug for more details.\
 
         self.run_robot_command(command)
 
-    def run_robot_command(self, command):
+    def run_robot_command(self, command, runner=None):
         """Run command in robotframework environment."""
         if not command:
             return
         result = []
         try:
-            result = run_command(self, command)
+            result = (runner or run_command)(self, command)
         except HandlerExecutionFailed as exc:
             print_error("! FAIL:", exc.message)
         except ExecutionFailed as exc:
@@ -120,6 +144,52 @@ Access https://github.com/imbus/robotframework-debug for more details.\
             for head, message in result:
                 print_output(head, message)
 
+    def do_timeit(self, args):
+        """Measure the execution time of keywords by running them repeatedly.
+
+        timeit [-n <number>] [-r <repeat>] <keyword line>
+
+        The keywords are run <number> times in each of <repeat> rounds.
+        Without -n the number is chosen so that a round takes at least 0.2 seconds.
+        """
+        options, command = parse_options(TIMEIT_OPTION, args, {"n": 0, "r": TIMEIT_DEFAULT_REPEAT})
+        number, repeat = int(options["n"]), int(options["r"])
+        if not command or HEADER_MATCHER.match(command) or not repeat:
+            print_error("< usage:", "timeit [-n <number>] [-r <repeat>] <keyword line>")
+            return
+        self.run_robot_command(
+            command, runner=lambda dbg_cmd, cmd: timeit_command(dbg_cmd, cmd, number, repeat)
+        )
+
+    def do_cprofile(self, args):
+        """Profile the Python functions called by keywords.
+
+        cprofile [--sort <key>] [--top <n>] [--dump <file>] <keyword line>
+
+        The functions are sorted by `cumtime` and the top 30 are printed by default.
+        Other sort keys are e.g. `tottime`, `ncalls` or `filename`.
+        `--dump` saves the statistics to a `.pstats` file for tools like snakeviz.
+        """
+        options, command = parse_options(
+            CPROFILE_OPTION, args, {"sort": "cumtime", "top": "30", "dump": None}
+        )
+        if (
+            not command
+            or HEADER_MATCHER.match(command)
+            or options["sort"] not in pstats.Stats.sort_arg_dict_default
+            or not options["top"].isdigit()
+        ):
+            print_error(
+                "< usage:", "cprofile [--sort <key>] [--top <n>] [--dump <file>] <keyword line>"
+            )
+            return
+        self.run_robot_command(
+            command,
+            runner=lambda dbg_cmd, cmd: cprofile_command(
+                dbg_cmd, cmd, options["sort"], int(options["top"]), options["dump"]
+            ),
+        )
+
     def get_rprompt_text(self):
         """Get text for bottom toolbar."""
         if self.last_keyword_exec_time == 0:
@@ -160,7 +230,7 @@ Access https://github.com/imbus/robotframework-debug for more details.\
             if lib:
                 print_output("< Keywords of library", lib.name)
                 for keyword in get_lib_keywords(lib):
-                    print_output(f"   {keyword.name}\t", keyword.shortdoc)
+                    print_output(f"   {keyword.name}\t", keyword.short_doc)
 
     do_k = do_keywords
 
@@ -183,6 +253,44 @@ Access https://github.com/imbus/robotframework-debug for more details.\
 
     do_d = do_docs
 
+    def do_search(self, args):
+        """Search keywords by name, argument names and documentation.
+
+        search <terms>
+        """
+        if not args.strip():
+            print_error("< search needs terms like", "search upload file")
+            return
+        keyword_catalog.refresh()
+        results = get_search_index(keyword_catalog).search(args)
+        if not results:
+            print_error("< no keyword found for", args)
+            return
+        print_output("< Keywords matching", args)
+        for _, keyword in results:
+            print_output(f"   {keyword.parent.name}.{keyword.name}\t", keyword.short_doc)
+
+    def do_history(self, arg):
+        """Show the history or the most recent commands containing a text.
+
+        history [<text>]
+        """
+        text = arg.strip()
+        if not text:
+            super().do_history(arg)
+            return
+        commands = [
+            command
+            for command in get_history_index(self.history).search(text)
+            if not command.startswith("history")
+        ]
+        if not commands:
+            print_error("< no command found containing", text)
+            return
+        print_output("< Commands containing", text)
+        for command in reversed(commands):
+            print_output("  ", command.replace("\n", "\n   "))
+
     def emptyline(self):
         """Repeat last nonempty command if in step mode."""
         self.repeat_last_nonempty_command = is_step_mode()
@@ -244,6 +352,76 @@ class DebugCmd(ReplCmd):
 
     do_ll = do_longlist
 
+    def do_break(self, args):
+        """Set a breakpoint at a source line or keyword, list breakpoints without arguments.
+
+        b(reak) [<file>:<line> | <keyword_name>] [if <condition>] [after <n> hits]
+        b(reak) -d <number> | all
+
+        Conditions are Python expressions, Robot variables are used as objects.
+        """
+        listener = self.library.listener
+        args = args.strip()
+        if not args:
+            if not listener.breakpoints:
+                print_output("<", "No breakpoints set.")
+            for breakpoint_ in listener.breakpoints:
+                print_output(
+                    f"   {breakpoint_.number}",
+                    f"{breakpoint_.spec}    hits: {breakpoint_.hits}",
+                )
+            return
+        if args.startswith("-d"):
+            number = args[2:].strip()
+            if number == "all":
+                listener.clear_breakpoints()
+                print_output("<", "Deleted all breakpoints.")
+            elif number.isdigit() and int(number) in listener.breakpoints.breakpoints:
+                print_output("< Deleted", str(listener.remove_breakpoint(int(number))))
+            else:
+                print_error("< no breakpoint", number)
+            return
+        try:
+            print_output("< Set", str(listener.add_breakpoint(args)))
+        except (SyntaxError, ValueError) as exc:
+            print_error("< invalid breakpoint", str(exc))
+
+    do_b = do_break
+
+    def do_profile(self, args):
+        """Profile the execution time of keywords until the end of the run or `profile off`.
+
+        profile on | off | reset
+        profile report [self | total | calls | mean | p95] [<top>]
+        profile flamegraph <file>
+
+        `flamegraph` writes the call stacks weighted by self time in the collapsed
+        format of flame graph tools.
+        """
+        profiler = self.library.listener.profiler
+        command, *options = args.split() or ["report"]
+        if command in ["on", "off"]:
+            self.library.listener.set_profiling(command == "on")
+            print_output("<", f"Profiling {command}.")
+        elif command == "reset":
+            profiler.reset()
+            print_output("<", "Profile data cleared.")
+        elif command == "report":
+            sort = next((opt for opt in options if opt in SORT_KEYS), "self")
+            top = next((int(opt) for opt in options if opt.isdigit()), 20)
+            if not profiler.stats:
+                print_output("<", "No profile data. Use `profile on` and continue the execution.")
+                return
+            print_output("<", f"Hot keywords ranked by {sort}:")
+            for line in profiler.report(sort, top):
+                print_output("", line)
+        elif command == "flamegraph" and options:
+            path = " ".join(options)
+            profiler.write_folded_stacks(path)
+            print_output("<", f"Folded call stacks written to {path}")
+        else:
+            print_error("< unknown profile command", command)
+
     def list_source(self, longlist=False):
         """List source code."""
         # if not is_step_mode():
@@ -258,6 +436,23 @@ class DebugCmd(ReplCmd):
         )
 
 
+def prewarm_completion(cmd_class, libs):
+    """Build the catalog and completion index of ``libs`` in a background thread.
+
+    The prompt takes them over when it opens, or waits until they are complete.
+    Errors are ignored here, the prompt builds what is missing itself.
+    """
+
+    def prewarm():
+        try:
+            keyword_catalog.refresh(libs)
+            get_completion_index(keyword_catalog, cmd_class.get_helps())
+        except Exception:
+            return
+
+    threading.Thread(target=prewarm, name="RobotDebug prewarm", daemon=True).start()
+
+
 def reset_robotframework_exception():
     """Resume RF after press ctrl+c during keyword running."""
     if STOP_SIGNAL_MONITOR._signal_count:
@@ -286,7 +481,7 @@ def run_command(dbg_cmd, command: str) -> List[Tuple[str, str]]:
     if HEADER_MATCHER.match(command):
         _import_resource_from_string(command)
         return [("i:", "Resource imported.")]
-    test = get_test_body_from_string(command)
+    test, assign = parsed_command_cache.get(command)
     if len(test.body) > 1:
         start = time.monotonic()
         for kw in test.body:
@@ -298,7 +493,6 @@ def run_command(dbg_cmd, command: str) -> List[Tuple[str, str]]:
         start = time.monotonic()
         return_val = run_keyword(kw, ctx)
         dbg_cmd.last_keyword_exec_time = time.monotonic() - start
-    assign = set(_get_assignments(test))
     if not assign and return_val is not None:
         return [("<", repr(return_val))]
     if assign:
@@ -311,6 +505,89 @@ def run_command(dbg_cmd, command: str) -> List[Tuple[str, str]]:
     return []
 
 
+def timeit_command(dbg_cmd, command: str, number: int = 0, repeat: int = TIMEIT_DEFAULT_REPEAT):
+    """Run a command ``number`` times in each of ``repeat`` rounds and summarize the timings."""
+    ctx = BuiltIn()._get_context()
+    body = list(get_test_body_from_string(command).body)
+
+    def timer(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for kw in body:
+                run_keyword(kw, ctx)
+        return time.perf_counter() - start
+
+    if not number:
+        number = _calibrate(timer)
+    timings = [timer(number) / number for _ in range(repeat)]
+    dbg_cmd.last_keyword_exec_time = min(timings)
+    best, median = _format_time(min(timings)), _format_time(statistics.median(timings))
+    mean, stddev = _format_time(statistics.mean(timings)), _format_time(statistics.pstdev(timings))
+    return [
+        ("<", f"{number} loops, best of {repeat}: {best} per loop"),
+        ("#", f"min {best}, median {median}, mean {mean}, stddev {stddev}"),
+    ]
+
+
+def cprofile_command(
+    dbg_cmd, command: str, sort: str = "cumtime", top: int = 30, dump: Optional[str] = None
+):
+    """Run a command with the Python profiler and print its statistics, even if it fails."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            return run_command(dbg_cmd, command)
+        finally:
+            profiler.disable()
+    finally:
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).strip_dirs().sort_stats(sort).print_stats(top)
+        for line in output.getvalue().strip("\n").splitlines():
+            print_output("", line)
+        if dump:
+            try:
+                profiler.dump_stats(dump)
+            except OSError as exc:
+                print_error("! Profile not written:", str(exc))
+            else:
+                print_output("<", f"Profile written to {dump}")
+
+
+def parse_options(pattern: re.Pattern, args: str, defaults: dict) -> Tuple[dict, str]:
+    """Options at the start of ``args`` matched by ``pattern`` in any order, and the rest.
+
+    ``pattern`` matches one option with the groups ``option`` and ``value``,
+    including the whitespace after it. Options missing in ``args`` keep
+    their value from ``defaults``.
+    """
+    options = dict(defaults)
+    command = args.strip()
+    option = pattern.match(command)
+    while option:
+        options[option.group("option")] = option.group("value")
+        command = command[option.end() :]
+        option = pattern.match(command)
+    return options, command
+
+
+def _calibrate(timer) -> int:
+    """Find the number of loops taking at least 0.2 seconds, like ``timeit.Timer.autorange``."""
+    base = 1
+    while True:
+        for number in (base, base * 2, base * 5):
+            if timer(number) >= TIMEIT_MIN_ROUND_TIME:
+                return number
+        base *= 10
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
 def run_keyword(keyword: Keyword, context: _ExecutionContext):
     if IS_RF_7:
         test = context.test or context.suite
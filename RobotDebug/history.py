@@ -0,0 +1,263 @@
+"""Command history stored in SQLite and an index for prefix and substring lookups."""
+
+import sqlite3
+import threading
+import weakref
+from bisect import bisect_right
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from prompt_toolkit.history import FileHistory, History
+
+MAX_HISTORY_SIZE = 10000
+COMPACT_INTERVAL = 100
+CONNECT_TIMEOUT = 10
+MAX_SEARCH_RESULTS = 20
+PRIVATE_PREFIX = "_"
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+class HistoryIndex:
+    """Commands of a history, oldest first, joined into one text.
+
+    Commands and their lines are separated by newlines, so the most recent
+    line starting with a prefix is found with one ``rfind`` of the prefix
+    after a newline. ``starts`` holds the offset of every command, so a
+    match is mapped to its command with a binary search.
+    """
+
+    def __init__(self, commands: Sequence[str] = (), key=None):
+        self.key = key
+        self.commands = list(commands)
+        self.starts: List[int] = []
+        offset = 1
+        for command in self.commands:
+            self.starts.append(offset)
+            offset += len(command) + 1
+        self.text = "\n" + "\n".join(self.commands)
+
+    def find_line(self, prefix: str) -> Optional[str]:
+        """The most recent line of any command starting with ``prefix``."""
+        if not prefix or "\n" in prefix:
+            return None
+        start = self.text.rfind(f"\n{prefix}") + 1
+        if not start:
+            return None
+        end = self.text.find("\n", start)
+        return self.text[start : end if end >= 0 else None]
+
+    def search(self, text: str, limit: int = MAX_SEARCH_RESULTS) -> List[str]:
+        """The ``limit`` most recent commands containing ``text``."""
+        results: List[str] = []
+        if not text:
+            return results
+        end = len(self.text)
+        while len(results) < limit:
+            position = self.text.rfind(text, 0, end)
+            if position < 0:
+                break
+            number = max(bisect_right(self.starts, position) - 1, 0)
+            command = self.commands[number]
+            if command not in results:
+                results.append(command)
+            end = self.starts[number] - 1
+        return results
+
+
+_history_indexes: "weakref.WeakKeyDictionary[History, HistoryIndex]" = weakref.WeakKeyDictionary()
+_history_indexes_lock = threading.Lock()
+
+
+def get_history_index(history: History) -> HistoryIndex:
+    """The index of the loaded commands of ``history``, built again when they changed.
+
+    Changes are noticed by the ``generation`` of a ``SQLiteHistory``, and
+    by the number and the last of the commands of other histories.
+    """
+    commands = history.get_strings()
+    key = (getattr(history, "generation", None), len(commands), commands[-1] if commands else None)
+    with _history_indexes_lock:
+        index = _history_indexes.get(history)
+        if index is None or index.key != key:
+            index = _history_indexes[history] = HistoryIndex(commands, key)
+        return index
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection):
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        with suppress(sqlite3.Error):
+            connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _is_text_file(path: Path) -> bool:
+    try:
+        with path.open("rb") as file:
+            header = file.read(len(SQLITE_HEADER))
+    except OSError:
+        return False
+    return bool(header) and header != SQLITE_HEADER
+
+
+class SQLiteHistory(History):
+    """History of commands in a SQLite database shared by all shells and processes.
+
+    Every command is stored once, entering it again makes it the most recent
+    one. Writers lock the database for one insert only, so parallel robot
+    processes like pabot workers can share the history. When more than
+    ``max_size`` commands are stored, the oldest ones are deleted every
+    ``COMPACT_INTERVAL`` inserts. Commands starting with ``_`` are private
+    and not stored.
+
+    The commands are read when the prompt asks for them the first time and
+    again only after another process stored some. ``generation`` is counted
+    up whenever the loaded commands change. Commands of the text file
+    written by ``FileHistory`` at ``legacy_path`` are imported into a new
+    database. If ``path`` is such a text file itself, the database is created
+    next to it. Without a path or if the database can not be used, the
+    history is kept in memory.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        legacy_path: Optional[str] = None,
+        max_size: int = MAX_HISTORY_SIZE,
+    ):
+        super().__init__()
+        self.path = Path(path).expanduser() if path else None
+        self.legacy_path = Path(legacy_path).expanduser() if legacy_path else None
+        self.max_size = max_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        self.generation = 0
+        self._lock = threading.RLock()
+
+    async def load(self):
+        if self._loaded and self._changed_elsewhere():
+            self._loaded = False
+        async for item in super().load():
+            yield item
+
+    def load_history_strings(self) -> Iterable[str]:
+        connection = self._connect()
+        if connection is None:
+            return list(self._loaded_strings)
+        with self._lock:
+            try:
+                self._data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+                rows = connection.execute(
+                    "SELECT command FROM history ORDER BY id DESC LIMIT ?", (self.max_size,)
+                ).fetchall()
+            except sqlite3.Error:
+                return list(self._loaded_strings)
+            self.generation += 1
+        return [command for (command,) in rows]
+
+    def append_string(self, string: str):
+        """Append string to history unless it is private."""
+        if string.startswith(PRIVATE_PREFIX):
+            return
+        with suppress(ValueError):
+            self._loaded_strings.remove(string)
+        super().append_string(string)
+        del self._loaded_strings[self.max_size :]
+        self.generation += 1
+
+    def store_string(self, string: str):
+        connection = self._connect()
+        if connection is None:
+            return
+        with self._lock:
+            try:
+                with _transaction(connection):
+                    cursor = connection.execute(
+                        "INSERT OR REPLACE INTO history (command) VALUES (?)", (string,)
+                    )
+                    if cursor.lastrowid % COMPACT_INTERVAL == 0:
+                        self._compact(connection)
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _changed_elsewhere(self) -> bool:
+        if self._connection is None:
+            return False
+        with self._lock:
+            try:
+                data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error:
+                return False
+        return data_version != self._data_version
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        with self._lock:
+            if self._connection is None and self.path is not None:
+                try:
+                    self._connection = self._open()
+                except (OSError, sqlite3.Error):
+                    self.path = None
+            return self._connection
+
+    def _open(self) -> sqlite3.Connection:
+        if _is_text_file(self.path):
+            self.legacy_path = self.path
+            self.path = self.path.with_name(f"{self.path.name}.db")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(
+            str(self.path), timeout=CONNECT_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        try:
+            with _transaction(connection):
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS history "
+                    "(id INTEGER PRIMARY KEY AUTOINCREMENT, command TEXT NOT NULL UNIQUE)"
+                )
+                if connection.execute("SELECT NOT EXISTS (SELECT 1 FROM history)").fetchone()[0]:
+                    self._import_legacy(connection)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _import_legacy(self, connection: sqlite3.Connection):
+        if not self.legacy_path or not self.legacy_path.is_file():
+            return
+        commands = list(FileHistory(str(self.legacy_path)).load_history_strings())
+        connection.executemany(
+            "INSERT OR REPLACE INTO history (command) VALUES (?)",
+            ((command,) for command in reversed(commands)),
+        )
+        self._compact(connection)
+
+    def _compact(self, connection: sqlite3.Connection):
+        connection.execute(
+            "DELETE FROM history WHERE id <= "
+            "(SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+
+_histories: Dict[Tuple[str, str], SQLiteHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_history(path: Optional[str], legacy_path: Optional[str] = None) -> SQLiteHistory:
+    """The history at ``path``, shared by all shells of this process."""
+    key = (str(path or ""), str(legacy_path or ""))
+    with _histories_lock:
+        history = _histories.get(key)
+        if history is None:
+            history = _histories[key] = SQLiteHistory(path, legacy_path)
+        return history
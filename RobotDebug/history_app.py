@@ -7,7 +7,7 @@ from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
 from prompt_toolkit.cursor_shapes import CursorShape
 from prompt_toolkit.filters import Always, has_selection
-from prompt_toolkit.history import FileHistory
+from prompt_toolkit.history import History
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.layout import Dimension
 from prompt_toolkit.layout.containers import HSplit, VSplit, Window
@@ -56,7 +56,7 @@ def bottom_toolbar():
 def run_history(context):
     buffer1 = Buffer()
     buffer2 = Buffer()
-    his: FileHistory = context.history
+    his: History = context.history
     history = get_history_content(his)
     kw_history = get_history_content(his, False)
     buffer1.text = "\n".join(history)
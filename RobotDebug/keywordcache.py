@@ -0,0 +1,307 @@
+"""Compact keyword specs of imported libraries and their on-disk cache."""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from copy import copy
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from robot.utils import getshortdoc, safe_str, split_tags_from_doc, unescape
+from robot.version import get_version
+
+from .globals import IS_RF_7
+
+CACHE_PATH = os.environ.get("RFDEBUG_CACHE") or None
+CACHE_FORMAT = 2
+NO_DEFAULTS = MappingProxyType({})
+FILE_NAME_UNSAFE = re.compile(r"[^\w.-]")
+
+
+class ArgumentsSpec(NamedTuple):
+    """The parts of a keyword's argument specification used by the completion."""
+
+    text: str = ""
+    positional_or_named: Tuple[str, ...] = ()
+    named_only: Tuple[str, ...] = ()
+    defaults: Mapping[str, str] = NO_DEFAULTS
+
+    @classmethod
+    def from_argument_spec(cls, args) -> "ArgumentsSpec":
+        if not args:
+            return NO_ARGUMENTS
+        if getattr(args, "embedded", None):
+            args = _without_embedded(args)
+        defaults = {name: safe_str(value) for name, value in args.defaults.items()}
+        return cls(
+            str(args),
+            tuple(args.positional_or_named),
+            tuple(args.named_only),
+            defaults or NO_DEFAULTS,
+        )
+
+    def to_json(self) -> list:
+        return [self.text, self.positional_or_named, self.named_only, dict(self.defaults)]
+
+    @classmethod
+    def from_json(cls, data: list) -> "ArgumentsSpec":
+        text, positional_or_named, named_only, defaults = data
+        if not (text or positional_or_named or named_only or defaults):
+            return NO_ARGUMENTS
+        return cls(text, tuple(positional_or_named), tuple(named_only), defaults or NO_DEFAULTS)
+
+    def __str__(self):
+        return self.text
+
+    def __hash__(self):
+        return hash(self.text)
+
+
+NO_ARGUMENTS = ArgumentsSpec()
+
+
+def _without_embedded(args):
+    """Copy of ``args`` without the embedded arguments, like Libdoc shows them."""
+    args = copy(args)
+    embedded = len(args.embedded)
+    positional_only = len(args.positional_only)
+    args.positional_only = args.positional_only[embedded:]
+    if embedded > positional_only:
+        args.positional_or_named = args.positional_or_named[embedded - positional_only :]
+    args.embedded = ()
+    return args
+
+
+class KeywordSpec:
+    """Name, arguments and short documentation of a library or resource keyword.
+
+    The full documentation is only needed by the ``docs`` command, so it is
+    read from the imported library when requested instead of being stored.
+    """
+
+    __slots__ = ("args", "name", "parent", "short_doc")
+
+    def __init__(self, parent: "LibrarySpec", name: str, args=NO_ARGUMENTS, short_doc=""):
+        self.parent = parent
+        self.name = name
+        self.args = args
+        self.short_doc = short_doc
+
+    @property
+    def doc(self) -> str:
+        return self.parent.get_doc(self.name)
+
+    def to_json(self) -> list:
+        return [self.name, self.short_doc, *self.args.to_json()]
+
+    @classmethod
+    def from_json(cls, parent, data: list) -> "KeywordSpec":
+        name, short_doc, *args = data
+        return cls(parent, name, ArgumentsSpec.from_json(args), short_doc)
+
+
+class LibrarySpec:
+    """Keyword specs of one imported library or resource.
+
+    The specs are built from the keywords of the imported library itself,
+    Libdoc models are not created. Keywords with equal arguments share
+    one ``ArgumentsSpec``.
+    """
+
+    __slots__ = ("keywords", "lib", "name", "resource", "version")
+
+    def __init__(self, lib, resource: bool = False):
+        self.lib = lib
+        self.name = lib.name
+        self.version = getattr(lib, "version", "")
+        self.resource = resource
+        self.keywords: List[KeywordSpec] = []
+
+    @classmethod
+    def from_library(cls, lib, resource: bool = False) -> "LibrarySpec":
+        spec = cls(lib, resource)
+        arguments: Dict[ArgumentsSpec, ArgumentsSpec] = {}
+        for keyword in _get_implementations(lib):
+            args = ArgumentsSpec.from_argument_spec(_get_arguments(keyword))
+            short_doc = getshortdoc(spec._get_documentation(keyword))
+            spec.keywords.append(
+                KeywordSpec(spec, keyword.name, arguments.setdefault(args, args), short_doc)
+            )
+        spec.keywords.sort(key=lambda keyword: keyword.name.lower())
+        return spec
+
+    def get_doc(self, name: str) -> str:
+        for keyword in _get_implementations(self.lib):
+            if keyword.name == name:
+                return self._get_documentation(keyword)
+        return ""
+
+    def get_docs(self) -> Dict[str, str]:
+        """Full documentation of all keywords by name."""
+        return {
+            keyword.name: self._get_documentation(keyword)
+            for keyword in _get_implementations(self.lib)
+        }
+
+    def _get_documentation(self, keyword) -> str:
+        doc = unescape(keyword.doc) if self.resource else keyword.doc
+        return split_tags_from_doc(doc)[0]
+
+    def to_json(self) -> dict:
+        return {"keywords": [keyword.to_json() for keyword in self.keywords]}
+
+    @classmethod
+    def from_json(cls, lib, data: dict) -> "LibrarySpec":
+        spec = cls(lib)
+        arguments: Dict[ArgumentsSpec, ArgumentsSpec] = {}
+        for item in data["keywords"]:
+            keyword = KeywordSpec.from_json(spec, item)
+            keyword.args = arguments.setdefault(keyword.args, keyword.args)
+            spec.keywords.append(keyword)
+        return spec
+
+
+def _get_implementations(lib):
+    return lib.keywords if IS_RF_7 else lib.handlers
+
+
+def _get_arguments(keyword):
+    return keyword.args if IS_RF_7 else keyword.arguments
+
+
+def _import_args(lib) -> list:
+    if hasattr(lib, "init") and hasattr(lib.init, "positional"):
+        positional, named = lib.init.positional, lib.init.named
+    else:
+        positional = getattr(lib, "positional_args", [])
+        named = getattr(lib, "named_args", {})
+    return [safe_str(arg) for arg in positional] + [
+        f"{name}={safe_str(value)}" for name, value in dict(named).items()
+    ]
+
+
+def _source_stat(source) -> Optional[list]:
+    """Modification time and size of a library source.
+
+    The keywords of a package library are usually defined in its submodules,
+    so for a package ``__init__.py`` the newest modification time, the total
+    size and the number of all Python files of the package are used.
+    """
+    try:
+        path = Path(source)
+        stat = path.stat()
+    except (OSError, TypeError, ValueError):
+        return None
+    if path.name != "__init__.py":
+        return [stat.st_mtime_ns, stat.st_size]
+    mtime, size, count = 0, 0, 0
+    for module in path.parent.rglob("*.py"):
+        try:
+            stat = module.stat()
+        except OSError:
+            continue
+        mtime, size, count = max(mtime, stat.st_mtime_ns), size + stat.st_size, count + 1
+    return [mtime, size, count]
+
+
+class KeywordCache:
+    """Keyword specs of libraries stored as one JSON file per library and import arguments.
+
+    A cached spec is valid as long as the library name, version and source
+    file, the Robot Framework version and the cache format are unchanged.
+    A stale spec is still returned, so the prompt opens immediately, while
+    a fresh one is built in the background. ``updates`` counts the specs
+    rebuilt that way, so the catalog knows when to pick them up.
+    Libraries without a source file are not cached, and nothing is cached
+    without a ``path``, which is the default unless RFDEBUG_CACHE is set.
+    """
+
+    def __init__(self, path: Optional[str] = CACHE_PATH):
+        self.path = Path(path).expanduser() if path else None
+        self.updates = 0
+        self._specs: Dict[int, LibrarySpec] = {}
+        self._rebuilding = set()
+        self._lock = threading.Lock()
+
+    def get(self, lib, build: Callable[[object], LibrarySpec]) -> LibrarySpec:
+        key = self.key(lib)
+        file = self.file(lib)
+        if key is None or file is None:
+            return build(lib)
+        data = self._read(file)
+        if data and data.get("key") == key:
+            return LibrarySpec.from_json(lib, data["spec"])
+        if data and data.get("format") == CACHE_FORMAT:
+            self._rebuild_in_background(lib, build, key, file)
+            return LibrarySpec.from_json(lib, data["spec"])
+        spec = build(lib)
+        self._write(file, key, spec)
+        return spec
+
+    def pop_rebuilt(self, lib) -> Optional[LibrarySpec]:
+        """Return and forget the spec of ``lib`` rebuilt in the background, if any."""
+        with self._lock:
+            spec = self._specs.pop(id(lib), None)
+        return spec if spec and spec.lib is lib else None
+
+    def key(self, lib) -> Optional[list]:
+        stat = _source_stat(lib.source)
+        if stat is None:
+            return None
+        version = getattr(lib, "version", "")
+        return [CACHE_FORMAT, get_version(), lib.name, version, str(lib.source), *stat]
+
+    def file(self, lib) -> Optional[Path]:
+        if not self.path:
+            return None
+        identity = json.dumps([lib.name, _import_args(lib)])
+        digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+        return self.path / f"{FILE_NAME_UNSAFE.sub('_', lib.name)}-{digest}.json"
+
+    def _rebuild_in_background(self, lib, build, key, file):
+        with self._lock:
+            if file in self._rebuilding:
+                return
+            self._rebuilding.add(file)
+
+        def rebuild():
+            try:
+                spec = build(lib)
+            except Exception:
+                return
+            else:
+                self._write(file, key, spec)
+                with self._lock:
+                    self._specs[id(lib)] = spec
+                    self.updates += 1
+            finally:
+                with self._lock:
+                    self._rebuilding.discard(file)
+
+        threading.Thread(target=rebuild, name="RobotDebug keyword cache", daemon=True).start()
+
+    @staticmethod
+    def _read(file: Path) -> Optional[dict]:
+        try:
+            with file.open(encoding="utf-8") as cached:
+                return json.load(cached)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(file: Path, key: list, spec: LibrarySpec):
+        data = {"format": CACHE_FORMAT, "key": key, "spec": spec.to_json()}
+        temp = file.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        try:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with temp.open("w", encoding="utf-8") as output:
+                json.dump(data, output, separators=(",", ":"))
+            temp.replace(file)
+        except OSError:
+            temp.unlink(missing_ok=True)
+
+
+keyword_cache = KeywordCache()
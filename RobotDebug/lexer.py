@@ -1,19 +1,30 @@
 import re
-from pathlib import Path
-from typing import ClassVar, Dict, List
+from collections import OrderedDict
+from io import StringIO
+from threading import Lock
+from typing import ClassVar, Dict, Iterator, List, Tuple
 
 from pygments.lexer import Lexer
 from pygments.token import Token, _TokenType
+from robot.parsing import Token as RobotToken
 from robot.parsing import get_tokens
 
 
-def get_robot_token_from_file(file: Path):
-    return list(get_tokens(file))
+def get_robot_token_from_file(source):
+    """Tokenize a cached source file without reading it from disk again."""
+    return list(get_tokens(StringIO(source.text)))
 
 
 HEADER_MATCHER = re.compile(
     r"\s*\*+ ?(keywords?|settings?|variables?|comments?) ?\**", re.IGNORECASE
 )
+BLOCK_MATCHER = re.compile(
+    r"^\s*\.\.\.|\b(FOR|IF|ELSE|END|WHILE|TRY|EXCEPT|FINALLY|BREAK|CONTINUE|RETURN|GROUP)\b",
+    re.MULTILINE,
+)
+SETTING_MATCHER = re.compile(r"^\s*\[", re.MULTILINE)
+TOKEN_CACHE_SIZE = 32
+LINE_CACHE_SIZE = 1024
 
 
 def get_robot_token(text):
@@ -42,6 +53,99 @@ def get_robot_token(text):
             yield token
 
 
+class TokenizedText:
+    """Robot tokens of a text and, tokenized on first use, their variable tokens."""
+
+    __slots__ = ("_variable_tokens", "tokens")
+
+    def __init__(self, tokens: Tuple[RobotToken, ...]):
+        self.tokens = tokens
+        self._variable_tokens = None
+
+    @property
+    def variable_tokens(self) -> Tuple[RobotToken, ...]:
+        if self._variable_tokens is None:
+            self._variable_tokens = tuple(get_variable_token(self.tokens))
+        return self._variable_tokens
+
+
+class TokenCache:
+    """Tokens of the REPL buffer shared by the syntax highlighter and the completer.
+
+    Both tokenize the same text on every keystroke. The tokens of the last
+    texts are kept, and are not to be modified. As long as no line depends on
+    another one, because there are no blocks, continuation lines or settings
+    like ``[Tags]``, which are errors when repeated, lines are also tokenized
+    and cached one by one. Editing one line of a pasted
+    snippet then only tokenizes that line again.
+    """
+
+    def __init__(self, size: int = TOKEN_CACHE_SIZE, line_size: int = LINE_CACHE_SIZE):
+        self.size = size
+        self.line_size = line_size
+        self._texts: OrderedDict[str, TokenizedText] = OrderedDict()
+        self._lines: OrderedDict[str, Tuple[RobotToken, ...]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, text: str) -> TokenizedText:
+        with self._lock:
+            tokenized = self._texts.get(text)
+            if tokenized:
+                self._texts.move_to_end(text)
+                return tokenized
+        if (
+            HEADER_MATCHER.match(text)
+            or "\n" not in text
+            or BLOCK_MATCHER.search(text)
+            or SETTING_MATCHER.search(text)
+        ):
+            tokens = tuple(get_robot_token(text))
+        else:
+            tokens = tuple(self._tokenize_lines(text.split("\n")))
+        tokenized = TokenizedText(tokens)
+        with self._lock:
+            self._texts[text] = tokenized
+            _trim(self._texts, self.size)
+        return tokenized
+
+    def _tokenize_lines(self, lines: List[str]) -> Iterator[RobotToken]:
+        last = len(lines)
+        for lineno, line in enumerate(lines, start=1):
+            if not line and lineno != last:  # an empty line alone has no EOL token
+                yield RobotToken(RobotToken.EOL, "\n", lineno, 0)
+            for cached in self._get_line(line):
+                token = RobotToken(
+                    cached.type, cached.value, lineno, cached.col_offset, cached.error
+                )
+                if lineno != last and token.type == RobotToken.EOL:
+                    token.value += "\n"
+                elif lineno != last and token.type == RobotToken.EOS:
+                    token.col_offset += 1
+                yield token
+
+    def _get_line(self, line: str) -> Tuple[RobotToken, ...]:
+        with self._lock:
+            tokens = self._lines.get(line)
+            if tokens is not None:
+                self._lines.move_to_end(line)
+                return tokens
+        tokens = tuple(get_robot_token(line))
+        with self._lock:
+            self._lines[line] = tokens
+            _trim(self._lines, self.line_size)
+        return tokens
+
+    def clear(self):
+        with self._lock:
+            self._texts.clear()
+            self._lines.clear()
+
+
+def _trim(cache: OrderedDict, size: int):
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
 def get_variable_token(token_list):
     for token in token_list:
         if len(token.value) == 0:
@@ -250,9 +354,8 @@ class RobotFrameworkLocalLexer(Lexer):
     #     return statement_at_cursor, token_at_cursor
 
     def get_tokens_unprocessed(self, text):
-        token_list = get_robot_token(text)
         index = 0
-        for v_token in get_variable_token(token_list):
+        for v_token in token_cache.get(text).variable_tokens:
             yield index, self.to_pygments_token_type(v_token), v_token.value
             index += len(v_token.value)
 
@@ -267,3 +370,6 @@ class RobotFrameworkLocalLexer(Lexer):
             if re.match(r"\$\{\d+}", token.value):
                 return Token.Name.Constant
         return self.ROBOT_TO_PYGMENTS.get(token.type, Token.Generic.Error)
+
+
+token_cache = TokenCache()
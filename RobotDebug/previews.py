@@ -0,0 +1,95 @@
+"""Short previews of variable values for the completion menu."""
+
+import reprlib
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+PREVIEW_LENGTH = 80
+IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, type(None))
+
+
+class PreviewRepr(reprlib.Repr):
+    """A ``reprlib.Repr`` that never builds the full repr of large strings or containers.
+
+    Subclasses of the builtin containers, like Robot's ``DotDict``, are
+    shortened like their base classes, and dictionaries are not sorted.
+    """
+
+    def __init__(self, length: int = PREVIEW_LENGTH):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxstring = self.maxlong = self.maxother = length
+
+    def repr1(self, x, level):
+        if not hasattr(self, f"repr_{type(x).__name__}"):
+            for types, method in [
+                ((str, bytes), self.repr_str),
+                (Mapping, self.repr_dict),
+                (list, self.repr_list),
+                (tuple, self.repr_tuple),
+            ]:
+                if isinstance(x, types):
+                    return method(x, level)
+        return super().repr1(x, level)
+
+    def repr_bytes(self, x, level):
+        return self.repr_str(x, level)
+
+    def repr_dict(self, x, level):
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        items = [
+            f"{self.repr1(key, level - 1)}: {self.repr1(x[key], level - 1)}"
+            for key in islice(x, self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            items.append("...")
+        return f"{{{', '.join(items)}}}"
+
+
+_preview_repr = PreviewRepr()
+
+
+def preview(value: Any, length: int = PREVIEW_LENGTH) -> str:
+    """Single line repr of ``value`` with at most ``length`` characters."""
+    try:
+        text = _preview_repr.repr(value)
+    except Exception:
+        text = f"<{type(value).__name__}>"
+    text = " ".join(text.split("\n"))
+    return text if len(text) <= length else f"{text[: length - 3]}..."
+
+
+class VariablePreviews:
+    """Previews of variable values, created when a menu row shows them.
+
+    A preview is kept as long as the variable holds the same object.
+    Previews of mutable objects are only reused until the next prompt,
+    because keywords run in between may have changed them in place.
+    """
+
+    def __init__(self):
+        self.epoch = 0
+        self._previews: Dict[str, Tuple[Any, Optional[int], str]] = {}
+
+    def next_epoch(self):
+        self.epoch += 1
+
+    def get(self, name: str, value: Any) -> str:
+        cached = self._previews.get(name)
+        if cached and cached[0] is value and cached[1] in (None, self.epoch):
+            return cached[2]
+        text = preview(value)
+        epoch = None if isinstance(value, IMMUTABLE_TYPES) else self.epoch
+        self._previews[name] = (value, epoch, text)
+        return text
+
+    def retain(self, names: Iterable[str]):
+        """Forget the previews of variables that do not exist anymore."""
+        self._previews = {name: self._previews[name] for name in names if name in self._previews}
+
+
+variable_previews = VariablePreviews()
@@ -0,0 +1,236 @@
+import math
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, Iterator, List, Optional
+
+KEYWORD_TYPES = frozenset(["KEYWORD", "SETUP", "TEARDOWN"])
+BUCKETS_PER_OCTAVE = 4
+MAX_BUCKET = 127
+MAX_CALL_STACKS = 100_000
+TRUNCATED = "[truncated]"
+REPORT_HEADER = f"{'calls':>9} {'total s':>10} {'self s':>10} {'mean ms':>10} {'p95 ms':>10} {'depth':>5}  keyword"
+SORT_KEYS = {
+    "self": lambda stats: stats.self_time,
+    "total": lambda stats: stats.total_time,
+    "calls": lambda stats: stats.calls,
+    "mean": lambda stats: stats.mean,
+    "p95": lambda stats: stats.percentile(0.95),
+}
+
+
+def _bucket(duration_ns: int) -> int:
+    """Logarithmic histogram bucket, four per doubling of the duration starting at 1µs."""
+    if duration_ns < 1000:  # noqa: PLR2004
+        return 0
+    return min(int(BUCKETS_PER_OCTAVE * math.log2(duration_ns / 1000)) + 1, MAX_BUCKET)
+
+
+def _bucket_limit(bucket: int) -> float:
+    return 1000 * 2 ** (bucket / BUCKETS_PER_OCTAVE)
+
+
+class KeywordStats:
+    """Constant memory accumulator of the calls of one keyword.
+
+    Durations are kept in a sparse logarithmic histogram, so percentiles
+    are estimated with an error of less than 19% without storing every call.
+    """
+
+    __slots__ = (
+        "active",
+        "calls",
+        "histogram",
+        "max_depth",
+        "max_time",
+        "name",
+        "self_time",
+        "total_time",
+    )
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.active = 0
+        self.total_time = 0
+        self.self_time = 0
+        self.max_time = 0
+        self.max_depth = 0
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, elapsed: int, self_time: int, depth: int):
+        self.calls += 1
+        if not self.active:  # recursive calls are already part of the outermost call
+            self.total_time += elapsed
+        self.self_time += self_time
+        self.max_time = max(self.max_time, elapsed)
+        self.max_depth = max(self.max_depth, depth)
+        bucket = _bucket(elapsed)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total_time / self.calls if self.calls else 0
+
+    def percentile(self, fraction: float) -> float:
+        """Upper limit of the histogram bucket containing the percentile."""
+        rank = fraction * self.calls
+        count = 0
+        for bucket in sorted(self.histogram):
+            count += self.histogram[bucket]
+            if count >= rank:
+                return min(_bucket_limit(bucket), self.max_time)
+        return self.max_time
+
+
+class CallNode:
+    """Node of the call tree, one per distinct call stack."""
+
+    __slots__ = ("children", "name", "self_time")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.children: Dict[str, CallNode] = {}
+        self.self_time = 0
+
+
+class _Frame:
+    __slots__ = ("children", "node", "start", "stats")
+
+    def __init__(self, stats: KeywordStats, node: CallNode, start: int):
+        self.stats = stats
+        self.node = node
+        self.start = start
+        self.children = 0
+
+
+class KeywordProfiler:
+    """Aggregates the execution time of keywords seen by the listener."""
+
+    def __init__(self, max_call_stacks: int = MAX_CALL_STACKS):
+        self.enabled = False
+        self.flamegraph: Optional[str] = None
+        self.stats: Dict[str, KeywordStats] = {}
+        self.max_call_stacks = max_call_stacks
+        self.call_tree = CallNode("")
+        self._call_stacks = 0
+        self._scopes: List[str] = []
+        self._scope_nodes: List[CallNode] = [self.call_tree]
+        self._stack: List[_Frame] = []
+        self._paused = False
+
+    def reset(self):
+        self.stats.clear()
+        self._stack.clear()
+        self.call_tree = CallNode("")
+        self._call_stacks = 0
+        self._scope_nodes = [self.call_tree]
+        for name in self._scopes:
+            self._scope_nodes.append(self._child_node(self._scope_nodes[-1], name))
+
+    def drop_open_keywords(self):
+        """Forget the running keywords and scopes, because their ends are not seen while disabled.
+
+        Keywords profiled after enabling the profiler again in the middle of
+        a suite or test are rooted at the call tree until the next scope starts.
+        """
+        for frame in self._stack:
+            frame.stats.active -= 1
+        self._stack.clear()
+        self._scopes.clear()
+        self._scope_nodes = [self.call_tree]
+
+    def start_scope(self, name: str):
+        """Enter a suite or test, which become the roots of the keyword call stacks."""
+        self._scopes.append(name)
+        self._scope_nodes.append(self._child_node(self._scope_nodes[-1], name))
+
+    def end_scope(self):
+        if self._scopes:
+            self._scopes.pop()
+            self._scope_nodes.pop()
+
+    def _child_node(self, parent: CallNode, name: str) -> CallNode:
+        name = name.replace(";", ",")  # separator of the folded stacks
+        node = parent.children.get(name)
+        if node:
+            return node
+        if self._call_stacks >= self.max_call_stacks:
+            name = TRUNCATED
+            node = parent.children.get(name)
+            if node:
+                return node
+        node = parent.children[name] = CallNode(name)
+        self._call_stacks += 1
+        return node
+
+    def start_keyword(self, name, attrs):
+        if self._paused or attrs["type"] not in KEYWORD_TYPES:
+            return
+        stats = self.stats.get(name)
+        if not stats:
+            stats = self.stats[name] = KeywordStats(name)
+        parent = self._stack[-1].node if self._stack else self._scope_nodes[-1]
+        self._stack.append(_Frame(stats, self._child_node(parent, name), perf_counter_ns()))
+        stats.active += 1
+
+    def end_keyword(self, name, attrs):
+        # Keywords already running when the profiler was enabled are not on the stack.
+        if self._paused or not self._stack or attrs["type"] not in KEYWORD_TYPES:
+            return
+        frame = self._stack.pop()
+        elapsed = perf_counter_ns() - frame.start
+        frame.stats.active -= 1
+        frame.stats.add(elapsed, elapsed - frame.children, len(self._stack) + 1)
+        frame.node.self_time += elapsed - frame.children
+        if self._stack:
+            self._stack[-1].children += elapsed
+
+    @contextmanager
+    def paused(self):
+        """Exclude the time spent in the debug shell and the keywords run from it."""
+        if self._paused:
+            yield
+            return
+        self._paused = True
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            pause = perf_counter_ns() - start
+            for frame in self._stack:
+                frame.start += pause
+            self._paused = False
+
+    def hot_keywords(self, sort: str = "self", top: int = 20) -> List[KeywordStats]:
+        finished = (stats for stats in self.stats.values() if stats.calls)
+        return sorted(finished, key=SORT_KEYS[sort], reverse=True)[:top]
+
+    def report(self, sort: str = "self", top: int = 20) -> List[str]:
+        """Lines of a table of the ``top`` keywords ranked by ``sort``."""
+        lines = [REPORT_HEADER]
+        for stats in self.hot_keywords(sort, top):
+            lines.append(
+                f"{stats.calls:>9} {stats.total_time / 1e9:>10.3f} {stats.self_time / 1e9:>10.3f} "
+                f"{stats.mean / 1e6:>10.3f} {stats.percentile(0.95) / 1e6:>10.3f} "
+                f"{stats.max_depth:>5}  {stats.name}"
+            )
+        return lines
+
+    def folded_stacks(self) -> Iterator[str]:
+        """Call stacks weighted by self time in microseconds, e.g. ``Suite;Test;High;low 1234``.
+
+        This is the collapsed stack format read by flame graph tools.
+        """
+        pending = [(child, child.name) for child in self.call_tree.children.values()]
+        while pending:
+            node, stack = pending.pop()
+            weight = node.self_time // 1000
+            if weight:
+                yield f"{stack} {weight}"
+            pending.extend((child, f"{stack};{child.name}") for child in node.children.values())
+
+    def write_folded_stacks(self, path: str):
+        with Path(path).open("w", encoding="utf-8") as output:
+            for line in self.folded_stacks():
+                output.write(f"{line}\n")
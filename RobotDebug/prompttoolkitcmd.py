@@ -1,14 +1,12 @@
 import cmd
 import re
-from pathlib import Path
 
 from prompt_toolkit.application import get_app
-from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+from prompt_toolkit.auto_suggest import AutoSuggestFromHistory, ThreadedAutoSuggest
 from prompt_toolkit.buffer import Buffer
 from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
 from prompt_toolkit.cursor_shapes import CursorShape
 from prompt_toolkit.filters import Condition, has_completions, has_selection
-from prompt_toolkit.history import FileHistory
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.lexers import PygmentsLexer
 from prompt_toolkit.output import ColorDepth
@@ -16,6 +14,7 @@ from prompt_toolkit.shortcuts import CompleteStyle, prompt
 
 from . import RobotDebug
 from .globals import StepMode
+from .history import get_history
 from .history_app import run_history
 from .lexer import HEADER_MATCHER, RobotFrameworkLocalLexer
 
@@ -267,22 +266,25 @@ class BaseCmd(cmd.Cmd):
 
     do_EOF = do_exit
 
-    def get_cmd_names(self):
+    @classmethod
+    def get_cmd_names(cls):
         """Get all command names of CMD shell."""
         pre = "do_"
         cut = len(pre)
-        return [_[cut:] for _ in self.get_names() if _.startswith(pre)]
+        return [_[cut:] for _ in dir(cls) if _.startswith(pre)]
 
-    def get_help_string(self, command_name):
+    @classmethod
+    def get_help_string(cls, command_name):
         """Get help document of command."""
-        func = getattr(self, f"do_{command_name}", None)
+        func = getattr(cls, f"do_{command_name}", None)
         if not func:
             return ""
         return func.__doc__
 
-    def get_helps(self):
+    @classmethod
+    def get_helps(cls):
         """Get all help documents of commands."""
-        return [(name, self.get_help_string(name) or name) for name in self.get_cmd_names()]
+        return [(name, cls.get_help_string(name) or name) for name in cls.get_cmd_names()]
 
     def get_completer(self):
         """Get completer instance."""
@@ -337,14 +339,6 @@ class BaseCmd(cmd.Cmd):
         return input(prompt=self.prompt)
 
 
-class PrivateHistory(FileHistory):
-    def append_string(self, string: str):
-        """Append string to history file."""
-        if string.startswith("_"):
-            return
-        super().append_string(string)
-
-
 class PromptToolkitCmd(BaseCmd):
     """CMD shell using prompt-toolkit."""
 
@@ -358,10 +352,10 @@ and resource file syntax like *** Keywords*** or *** Variables ***.
 Type "help" for more information.\
 """
 
-    def __init__(self, library, history_path=""):
+    def __init__(self, library, history_path="", legacy_history_path=None):
         super().__init__()
         self.library: RobotDebug = library
-        self.history = PrivateHistory(str(Path(history_path).expanduser()))
+        self.history = get_history(history_path, legacy_history_path)
         self.toolbar_token_tuple = ("", None, None)
         self.mouse_support = True
         self.complete_while_typing = False
@@ -464,12 +458,15 @@ Type "help" for more information.\
         else:
             prompt_str = self.prompt
         try:
+            # Completions and suggestions are computed in a background thread and
+            # dropped by prompt_toolkit when the text changed in the meantime.
             line = prompt(
-                auto_suggest=self.get_auto_suggester(),
+                auto_suggest=ThreadedAutoSuggest(self.get_auto_suggester()),
                 bottom_toolbar=self.bottom_toolbar,
                 clipboard=PyperclipClipboard(),
                 color_depth=ColorDepth.DEPTH_24_BIT,
                 completer=self.get_completer(),
+                complete_in_thread=True,
                 complete_style=CompleteStyle.COLUMN,
                 complete_while_typing=self.complete_while_typing,
                 cursor=CursorShape.BLINKING_BEAM,
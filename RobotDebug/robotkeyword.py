@@ -1,24 +1,39 @@
 import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Iterator, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from robot.libdocpkg.model import KeywordDoc, LibraryDoc
 from robot.libraries.BuiltIn import BuiltIn
-from robot.parsing import get_model
-from robot.running import TestSuite
+from robot.parsing import get_model, get_resource_model
+from robot.running import ResourceFileBuilder, TestCase, TestSuite
+from robot.running.builder.transformers import ResourceBuilder
+from robot.running.namespace import IMPORTER
 
 try:
     from robot.running import UserLibrary as ResourceFile
 except ImportError:
     from robot.running import ResourceFile
+try:
+    from robot.running import Import
+except ImportError:
+    from robot.running.model import Import
+try:
+    from robot.running.resourcemodel import ResourceFile as ResourceModel
+except ImportError:
+    from robot.running.model import ResourceFile as ResourceModel
+from robot.utils import normalize
 from robot.variables.search import is_variable
+from robot.version import get_version
 
-from .globals import KEYWORD_SEP
-from .robotlib import ImportedLibraryDocBuilder, ImportedResourceDocBuilder, get_libs
+from .globals import IS_RF_7, KEYWORD_SEP
+from .keywordcache import KeywordSpec, LibrarySpec, keyword_cache
+from .robotlib import get_libs
 
-_lib_keywords_cache = {}
-_resource_keywords_cache = {}
-temp_resources = []
+_lib_keywords_cache: Dict[int, Tuple[object, Optional[int], LibrarySpec]] = {}
+_shell_resources: Dict[int, Tuple[object, ResourceModel]] = {}
+SHELL_RESOURCE_SOURCE = Path(tempfile.gettempdir(), "RobotDebug_keywords.resource")
+PARSED_COMMAND_CACHE_SIZE = 256
 
 
 def parse_keyword(command) -> Tuple[List[str], str, List[str]]:
@@ -38,27 +53,71 @@ def parse_keyword(command) -> Tuple[List[str], str, List[str]]:
     return variables, keyword, args
 
 
-def get_lib_keywords(library) -> List[KeywordDoc]:
-    """Get keywords of imported library."""
-    if library.name not in _lib_keywords_cache:
+def get_lib_keywords(library) -> List[KeywordSpec]:
+    """Get keywords of imported library.
+
+    The keywords are cached per library or resource object, so libraries
+    imported with other arguments or aliases and resources imported again
+    get their own keywords. Resource keywords are also rebuilt when the
+    resource file was modified.
+    """
+    mtime = _get_mtime(library) if isinstance(library, ResourceFile) else None
+    cached = _lib_keywords_cache.get(id(library))
+    spec = cached[2] if cached and cached[0] is library and cached[1] == mtime else None
+    spec = keyword_cache.pop_rebuilt(library) or spec
+    if not spec:
         if isinstance(library, ResourceFile):
-            _lib_keywords_cache[library.name]: LibraryDoc = ImportedResourceDocBuilder().build(
-                library
-            )
+            spec = LibrarySpec.from_library(library, resource=True)
         else:
-            _lib_keywords_cache[library.name]: LibraryDoc = ImportedLibraryDocBuilder().build(
-                library
-            )
-    return _lib_keywords_cache[library.name].keywords
+            spec = keyword_cache.get(library, LibrarySpec.from_library)
+    _lib_keywords_cache[id(library)] = (library, mtime, spec)
+    return spec.keywords
+
+
+def _get_mtime(library) -> Optional[int]:
+    try:
+        return Path(library.source).stat().st_mtime_ns
+    except (OSError, TypeError):
+        return None
 
 
-def get_keywords() -> Iterator[KeywordDoc]:
+def invalidate_lib_keywords():
+    """Forget the keywords of libraries and resources that are not imported anymore.
+
+    Called after libraries or resources are imported from the shell, which
+    may replace imported ones. Keywords of the others are kept. The
+    pre-warm thread may add keywords meanwhile, so a snapshot of the keys
+    is checked.
+    """
+    imported = {id(lib) for lib in get_libs()}
+    for key in list(_lib_keywords_cache):
+        if key not in imported:
+            _lib_keywords_cache.pop(key, None)
+
+
+def reload_resource(path):
+    """Parse an imported resource file again, if it was modified since its keywords were read.
+
+    Robot Framework keeps parsed resource files for the whole run, so
+    importing an edited resource again would otherwise return the old one.
+    """
+    path = BuiltIn()._namespace._resolve_name(Import(Import.RESOURCE, path))
+    if path not in IMPORTER._resource_cache:
+        return
+    resource = IMPORTER._resource_cache[path]
+    cached = _lib_keywords_cache.get(id(resource))
+    if cached and cached[0] is resource and cached[1] == _get_mtime(resource):
+        return
+    IMPORTER._resource_cache[path] = ResourceFileBuilder().build(path)
+
+
+def get_keywords() -> Iterator[KeywordSpec]:
     """Get all keywords of libraries."""
     for lib in get_libs():
         yield from get_lib_keywords(lib)
 
 
-def find_keyword(keyword_name) -> List[KeywordDoc]:
+def find_keyword(keyword_name) -> List[KeywordSpec]:
     keyword_name = keyword_name.lower()
     return [
         keyword
@@ -72,7 +131,7 @@ def normalize_kw(keyword_name):
     return keyword_name.lower().replace("_", "").replace(" ", "")
 
 
-def get_test_body_from_string(command):
+def _parse_test_from_string(command):
     if "\n" in command:
         command = "\n  ".join(command.split("\n"))
     suite_str = f"""
@@ -85,23 +144,101 @@ Fake Test
     return suite.tests[0]
 
 
+class ParsedCommandCache:
+    """Parsed test bodies of the last executed commands.
+
+    Repeating a command with an empty line, timing it with ``timeit`` or
+    running it again from the history would parse the same text each time.
+    Commands are keyed by their text with the separators normalized and by
+    the Robot Framework version. Running a keyword does not modify its data,
+    so callers get a shallow copy of the test with its own body list.
+    """
+
+    def __init__(self, size: int = PARSED_COMMAND_CACHE_SIZE):
+        self.size = size
+        self._parsed: OrderedDict[tuple, Tuple[TestCase, Tuple[str, ...]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(command: str) -> tuple:
+        return get_version(), KEYWORD_SEP.sub("    ", command)
+
+    def get(self, command: str) -> Tuple[TestCase, Tuple[str, ...]]:
+        """The parsed test of ``command`` and the variables it assigns."""
+        key = self.key(command)
+        with self._lock:
+            parsed = self._parsed.get(key)
+            if parsed:
+                self._parsed.move_to_end(key)
+        if not parsed:
+            test = _parse_test_from_string(command)
+            parsed = test, tuple(dict.fromkeys(_get_assignments(test)))
+            with self._lock:
+                self._parsed[key] = parsed
+                while len(self._parsed) > self.size:
+                    self._parsed.popitem(last=False)
+        test, assignments = parsed
+        return test.copy(body=list(test.body)), assignments
+
+    def clear(self):
+        with self._lock:
+            self._parsed.clear()
+
+
+parsed_command_cache = ParsedCommandCache()
+
+
+def get_test_body_from_string(command):
+    return parsed_command_cache.get(command)[0]
+
+
+def _build_resource(command) -> ResourceModel:
+    model = get_resource_model(command, data_only=True)
+    if hasattr(ResourceModel, "from_model"):
+        resource = ResourceModel.from_model(model)
+    else:  # Robot Framework < 6.1
+        resource = ResourceModel()
+        ResourceBuilder(resource).visit(model)
+    resource.source = SHELL_RESOURCE_SOURCE
+    return resource
+
+
 def _import_resource_from_string(command):
-    res_file = tempfile.NamedTemporaryFile(
-        mode="w",
-        prefix="RobotDebug_keywords_",
-        suffix=".resource",
-        encoding="utf-8",
-        delete=False,
-    )
-    resource_path = Path(res_file.name)
-    try:
-        res_file.write(command)
-        res_file.close()
-        temp_resources.insert(0, str(resource_path.stem))
-        BuiltIn().import_resource(resource_path.resolve().as_posix())
-        BuiltIn().set_library_search_order(*temp_resources)
-    finally:
-        resource_path.unlink(missing_ok=True)
+    """Import keywords, variables and imports defined in the shell.
+
+    All keywords defined in the shell are kept in one resource that only
+    exists in memory. It is created again with every snippet, so libraries
+    and the catalog see a new resource, and a keyword defined again replaces
+    the old one. Variables defined again are overwritten. The resource comes
+    first in the library search order.
+    """
+    namespace = BuiltIn()._namespace
+    snippet = _build_resource(command)
+    keywords = {}
+    shell = _shell_resources.get(id(namespace))
+    if shell and shell[0] is namespace:
+        keywords = {normalize(kw.name, ignore="_"): kw for kw in shell[1].keywords}
+    for keyword in snippet.keywords:
+        name = normalize(keyword.name, ignore="_")
+        keywords.pop(name, None)
+        keywords[name] = keyword
+    resource = ResourceModel(source=SHELL_RESOURCE_SOURCE)
+    resource.keywords = list(keywords.values())
+    _shell_resources.clear()
+    _shell_resources[id(namespace)] = (namespace, resource)
+    if IS_RF_7:
+        namespace.variables.set_from_variable_section(snippet.variables, overwrite=True)
+        namespace._kw_store.resources[str(SHELL_RESOURCE_SOURCE)] = resource
+    else:
+        namespace.variables.set_from_variable_table(snippet.variables, overwrite=True)
+        namespace._kw_store.resources[str(SHELL_RESOURCE_SOURCE)] = ResourceFile(resource)
+    namespace._handle_imports(snippet.imports)
+    search_order = namespace._kw_store.search_order
+    if search_order[:1] != (resource.name,):
+        namespace.set_search_order(
+            (resource.name, *(name for name in search_order if name != resource.name))
+        )
+    invalidate_lib_keywords()
 
 
 def _get_assignments(body_elem):
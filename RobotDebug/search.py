@@ -0,0 +1,131 @@
+"""Full text search of keywords by name, argument names and documentation."""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from .catalog import KeywordCatalog
+from .keywordcache import KeywordSpec
+
+MAX_SEARCH_RESULTS = 10
+TOKEN_MATCHER = re.compile(r"[a-z0-9]+")
+CAMEL_CASE = re.compile(r"([a-z])([A-Z])")
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "be", "by", "for", "from", "given", "if", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with",
+])  # fmt: skip
+SUFFIXES = ("ing", "ed")
+PLURAL_EXCEPTIONS = ("ss", "us", "is")
+MIN_STEM_LENGTH = 3
+NAME_WEIGHT = 3
+ARGUMENT_WEIGHT = 2
+DOC_WEIGHT = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def stem(word: str) -> str:
+    """Strip common English suffixes, so ``uploads`` and ``uploading`` match ``upload``.
+
+    A final ``e`` is removed as well, so ``compare`` and ``compared`` give the same stem.
+    """
+    if word.endswith("ies") and len(word) > MIN_STEM_LENGTH + 1:
+        word = f"{word[:-3]}y"
+    elif (
+        word.endswith("s") and not word.endswith(PLURAL_EXCEPTIONS) and len(word) > MIN_STEM_LENGTH
+    ):
+        word = word[:-1]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            word = word[: -len(suffix)]
+            break
+    if word.endswith("e") and len(word) > MIN_STEM_LENGTH:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower case word stems of ``text`` without stop words.
+
+    Underscores and camel case are split, so ``max_split`` and ``maxSplit``
+    both give ``max`` and ``split``.
+    """
+    text = CAMEL_CASE.sub(r"\1 \2", text).lower().replace("_", " ")
+    return [stem(word) for word in TOKEN_MATCHER.findall(text) if word not in STOPWORDS]
+
+
+class SearchIndex:
+    """Inverted index of keywords ranked with Okapi BM25.
+
+    Name, argument name and documentation terms are counted with the
+    weights ``NAME_WEIGHT``, ``ARGUMENT_WEIGHT`` and ``DOC_WEIGHT``, so a
+    term in the name counts like three occurrences in the documentation.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[KeywordSpec, str]] = (), generation=None):
+        self.generation = generation
+        self.keywords: List[KeywordSpec] = []
+        self.lengths: List[float] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for keyword, doc in entries:
+            self._add(keyword, doc)
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+
+    def _add(self, keyword: KeywordSpec, doc: str):
+        number = len(self.keywords)
+        frequencies = Counter()
+        arguments = " ".join([*keyword.args.positional_or_named, *keyword.args.named_only])
+        for weight, text in [
+            (NAME_WEIGHT, keyword.name),
+            (ARGUMENT_WEIGHT, arguments),
+            (DOC_WEIGHT, doc),
+        ]:
+            for token in tokenize(text):
+                frequencies[token] += weight
+        self.keywords.append(keyword)
+        self.lengths.append(sum(frequencies.values()))
+        for token, frequency in frequencies.items():
+            self.postings.setdefault(token, []).append((number, frequency))
+
+    def search(self, text: str, limit: int = MAX_SEARCH_RESULTS) -> List[Tuple[float, KeywordSpec]]:
+        """The best ``limit`` keywords for the terms in ``text`` with their scores."""
+        scores: Dict[int, float] = {}
+        count = len(self.keywords)
+        for token in set(tokenize(text)):
+            postings = self.postings.get(token, ())
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, frequency in postings:
+                norm = 1 - BM25_B + BM25_B * self.lengths[number] / self.average_length
+                score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                scores[number] = scores.get(number, 0) + score
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self.keywords[number]) for number, score in best]
+
+
+def _get_entries(catalog: KeywordCatalog) -> Iterable[Tuple[KeywordSpec, str]]:
+    docs: Dict[int, Dict[str, str]] = {}
+    for keyword in catalog.keywords:
+        library = keyword.parent
+        if id(library) not in docs:
+            docs[id(library)] = library.get_docs()
+        yield keyword, docs[id(library)].get(keyword.name, "")
+
+
+_search_indexes: Dict[int, SearchIndex] = {}
+_search_indexes_lock = threading.Lock()
+
+
+def get_search_index(catalog: KeywordCatalog) -> SearchIndex:
+    """The search index of the current catalog generation, built on first use."""
+    with _search_indexes_lock:
+        search_index = _search_indexes.get(id(catalog))
+        if not search_index or search_index.generation != catalog.generation:
+            search_index = _search_indexes[id(catalog)] = SearchIndex(
+                _get_entries(catalog), catalog.generation
+            )
+        return search_index
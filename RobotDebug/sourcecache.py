@@ -0,0 +1,127 @@
+"""Bounded cache of source files shared by the listener and the source listing."""
+
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+class SourceFile:
+    """Content of a source file with a lazily built index of line offsets.
+
+    Only the raw bytes are kept. Lines are decoded on request, so printing
+    a single line does not materialize the rest of the file.
+    """
+
+    __slots__ = ("_offsets", "data", "mtime", "path", "size")
+
+    def __init__(self, path: str, data: bytes, mtime: int, size: int):
+        self.path = path
+        self.data = data
+        self.mtime = mtime
+        self.size = size
+        self._offsets = None
+
+    @property
+    def offsets(self) -> array:
+        """Start offset of every line plus the end of the data."""
+        if self._offsets is None:
+            data = self.data
+            offsets = array("q", [self.bom_length])
+            index = data.find(b"\n")
+            while index != -1:
+                offsets.append(index + 1)
+                index = data.find(b"\n", index + 1)
+            if offsets[-1] != len(data):
+                offsets.append(len(data))
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def line(self, lineno: int) -> Optional[str]:
+        """Return the line with the given 1-based number including its line break."""
+        offsets = self.offsets
+        if not 0 < lineno < len(offsets):
+            return None
+        return self.data[offsets[lineno - 1] : offsets[lineno]].decode("utf-8", "replace")
+
+    @property
+    def bom_length(self) -> int:
+        return len(UTF8_BOM) if self.data.startswith(UTF8_BOM) else 0
+
+    @property
+    def text(self) -> str:
+        return self.data[self.bom_length :].decode("utf-8", "replace")
+
+
+class SourceCache:
+    """LRU cache of source files limited by their total size in bytes.
+
+    Entries are validated against the modification time and size of the
+    file on every access, so edited files are read again.
+    """
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._files = OrderedDict()
+
+    def __contains__(self, path) -> bool:
+        return str(path) in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, path: Union[str, Path]) -> Optional[SourceFile]:
+        """Return the up-to-date content of ``path`` or None if it can not be read."""
+        if not path:
+            return None
+        path = str(path)
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            self.invalidate(path)
+            return None
+        source = self._files.get(path)
+        if source and source.mtime == stat.st_mtime_ns and source.size == stat.st_size:
+            self._files.move_to_end(path)
+            return source
+        self.invalidate(path)
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            return None
+        source = SourceFile(path, data, stat.st_mtime_ns, stat.st_size)
+        self._add(source)
+        return source
+
+    def get_line(self, path: Union[str, Path], lineno: int) -> Optional[str]:
+        source = self.get(path)
+        return source.line(lineno) if source else None
+
+    def invalidate(self, path: Union[str, Path]):
+        source = self._files.pop(str(path), None)
+        if source:
+            self.total_bytes -= len(source.data)
+
+    def clear(self):
+        self._files.clear()
+        self.total_bytes = 0
+
+    def _add(self, source: SourceFile):
+        if len(source.data) > self.max_bytes:
+            return
+        self._files[source.path] = source
+        self.total_bytes += len(source.data)
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._files.popitem(last=False)
+            self.total_bytes -= len(evicted.data)
+
+
+source_cache = SourceCache()
@@ -1,136 +1,248 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from prompt_toolkit.formatted_text import FormattedText, PygmentsTokens
 from pygments.token import Token
 
 from RobotDebug.lexer import (
     RobotFrameworkLocalLexer,
     get_robot_token_from_file,
 )
-from RobotDebug.styles import print_output, print_pygments_styles
+from RobotDebug.sourcecache import SourceFile, source_cache
+from RobotDebug.styles import (
+    STEP_STYLE,
+    print_fragments,
+    print_pygments_styles,
+)
 
 LINE_NO_TOKEN = Token.Operator.LineNumber
+SCOPE_TOKENS = frozenset(
+    [
+        RobotFrameworkLocalLexer.ROBOT_TO_PYGMENTS["HEADER"],
+        RobotFrameworkLocalLexer.ROBOT_TO_PYGMENTS["DEFINITION"],
+    ]
+)
+HIGHLIGHT_CACHE_BYTES = 2 * 1024 * 1024
+STEP_LINE_CACHE_SIZE = 1024
 
 
 def print_source_lines(style, source_file, lineno, before_and_after=5):
-    if not source_file or not lineno:
+    highlighted = highlight_cache.get(source_file)
+    if not highlighted or not lineno:
         return
 
-    Path(
-        source_file
-    ).open().readlines()  # noqa: SIM115  TODO: not sure why i did this. Maybe to check if file is actually readable...
-    prefixed_token = get_pygments_token_from_file(lineno, source_file)
-    printable_token = filter_token_by_lineno(
-        prefixed_token, lineno - before_and_after, lineno + before_and_after + 1
+    printable_token = highlighted.tokens(
+        lineno - before_and_after, lineno + before_and_after + 1, lineno
     )
     print_pygments_styles(printable_token, style)
 
 
 def print_test_case_lines(style, source_file, current_lineno):
-    if not source_file or not current_lineno:
+    highlighted = highlight_cache.get(source_file)
+    if not highlighted or not current_lineno:
         return
 
-    Path(
-        source_file
-    ).open().readlines()  # noqa: SIM115  TODO: not sure why i did this. Maybe to check if file is actually readable...
-    prefixed_token = get_pygments_token_from_file(current_lineno, source_file)
-    printable_token = filter_token_by_scope(prefixed_token, current_lineno)
+    start, end = highlighted.scope(current_lineno)
+    while end > start + 1 and not highlighted.line_text(end - 1).strip():
+        end -= 1
+    printable_token = highlighted.tokens(start, end, current_lineno)
+    if printable_token and printable_token[-1][1].endswith("\n"):
+        printable_token[-1] = (printable_token[-1][0], printable_token[-1][1].rstrip("\r\n"))
     print_pygments_styles(printable_token, style)
 
 
-def filter_token_by_lineno(token, start_lineno, end_lineno):
-    current_lineno = 0
-    for tok, val in token:
-        if tok == LINE_NO_TOKEN:
-            current_lineno += 1
-        if start_lineno <= current_lineno < end_lineno:
-            yield tok, val
-
-
-def filter_token_by_scope(token, current_lineno):
-    rf_to_py = RobotFrameworkLocalLexer.ROBOT_TO_PYGMENTS
-    scope_start_lineno = 0
-    scope_end_lineno = 1000000
-    line_found = False
-    lineno = 0
-    all_token = list(token)
-    for tok, _val in all_token:
-        if tok == LINE_NO_TOKEN:
-            lineno += 1
-        if not line_found and tok in [rf_to_py["HEADER"], rf_to_py["DEFINITION"]]:
-            scope_start_lineno = lineno
-        if lineno == current_lineno:
-            line_found = True
-        if line_found and tok in [rf_to_py["HEADER"], rf_to_py["DEFINITION"]]:
-            scope_end_lineno = lineno
-            break
-    filtered_token = list(filter_token_by_lineno(all_token, scope_start_lineno, scope_end_lineno))
-
-    tokens_to_remove = 0
-    for tok, val in reversed(filtered_token):
-        if tok == LINE_NO_TOKEN or val == "\n" or not val.strip():
-            tokens_to_remove += 1
+class HighlightedSource:
+    """Pygments tokens of a source file split into lines, with an index of its scopes.
+
+    A scope starts at a section header or at the name of a test or keyword
+    and ends where the next one starts. The first lines of the scopes are
+    kept sorted, so the scope of a line is found with a binary search.
+    """
+
+    __slots__ = ("lines", "mtime", "scope_starts", "size")
+
+    def __init__(self, source: SourceFile):
+        self.mtime = source.mtime
+        self.size = source.size
+        self.lines: List[List[Tuple]] = [[]]
+        self.scope_starts: List[int] = []
+        token = get_robot_token_from_file(source)
+        for tok, val in RobotFrameworkLocalLexer().get_pygments_token(token):
+            line = self.lines[-1]
+            if tok in SCOPE_TOKENS and (
+                not self.scope_starts or self.scope_starts[-1] != len(self.lines)
+            ):
+                self.scope_starts.append(len(self.lines))
+            line.append((tok, val))
+            if "\n" in val:
+                self.lines.append([])
+        if not self.lines[-1] and len(self.lines) > 1:
+            self.lines.pop()
+
+    @property
+    def line_count(self) -> int:
+        return len(self.lines)
+
+    def line_text(self, lineno: int) -> str:
+        return "".join(val for _tok, val in self.lines[lineno - 1])
+
+    def scope(self, lineno: int) -> Tuple[int, int]:
+        """First line of the scope of ``lineno`` and the line after its end."""
+        index = bisect_right(self.scope_starts, lineno)
+        start = self.scope_starts[index - 1] if index else 1
+        end = self.scope_starts[index] if index < len(self.scope_starts) else self.line_count + 1
+        return start, end
+
+    def tokens(self, start: int, end: int, current_lineno: int) -> List[Tuple]:
+        """Tokens of the lines from ``start`` up to, but not including, ``end``.
+
+        Each line is prefixed with its number, the ``current_lineno`` with an arrow.
+        """
+        tokens = []
+        for lineno in range(max(start, 1), min(end, self.line_count + 1)):
+            arrow = "->" if lineno == current_lineno else "  "
+            tokens.append((LINE_NO_TOKEN, f"{lineno:>3} {arrow}"))
+            tokens.extend(self.lines[lineno - 1])
+        return tokens
+
+
+class HighlightCache:
+    """Highlighted source files of the last listings, by path.
+
+    The cache is limited by the total size of the highlighted sources in
+    bytes, like the source cache. The source cache validates the
+    modification time and size of the file, and an entry is highlighted
+    again when they have changed.
+    """
+
+    def __init__(self, max_bytes: int = HIGHLIGHT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._files: OrderedDict[str, HighlightedSource] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path) -> Optional[HighlightedSource]:
+        source = source_cache.get(path)
+        if not source:
+            return None
+        highlighted = self.peek(source)
+        if highlighted:
+            return highlighted
+        highlighted = HighlightedSource(source)
+        with self._lock:
+            self._remove(source.path)
+            if highlighted.size <= self.max_bytes:
+                self._files[source.path] = highlighted
+                self.total_bytes += highlighted.size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._files.popitem(last=False)
+                self.total_bytes -= evicted.size
+        return highlighted
+
+    def peek(self, source: SourceFile) -> Optional[HighlightedSource]:
+        """The highlighted ``source`` if it is cached and up to date, without highlighting it."""
+        with self._lock:
+            highlighted = self._files.get(source.path)
+            if highlighted and (highlighted.mtime, highlighted.size) == (source.mtime, source.size):
+                self._files.move_to_end(source.path)
+                return highlighted
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self.total_bytes = 0
+
+    def _remove(self, path: str):
+        highlighted = self._files.pop(path, None)
+        if highlighted:
+            self.total_bytes -= highlighted.size
+
+
+highlight_cache = HighlightCache()
+
+
+class StepRenderer:
+    """Prints the location and the source line of a stepped keyword.
+
+    Stepping through a loop prints the same few lines again and again, so
+    the paths relative to the working directory and the fragments of the
+    lines are kept. A line is highlighted if its file was highlighted for a
+    listing already, otherwise it is printed as it is, because highlighting
+    a large resource file takes much longer than reading one line. Both
+    lines are written in one call.
+    """
+
+    def __init__(self, size: int = STEP_LINE_CACHE_SIZE):
+        self.size = size
+        self._cwd = None
+        self._paths: Dict[str, str] = {}
+        self._lines: OrderedDict[Tuple[str, int], Tuple[object, list]] = OrderedDict()
+
+    def relative_path(self, path) -> str:
+        """``path`` relative to the working directory, or as it is if it is outside of it."""
+        if not path:
+            return ""
+        cwd = Path.cwd()
+        if cwd != self._cwd:
+            self._cwd = cwd
+            self._paths.clear()
+        relative = self._paths.get(path)
+        if relative is None:
+            try:
+                relative = str(Path(path).relative_to(cwd))
+            except ValueError:
+                relative = str(path)
+            self._paths[path] = relative
+        return relative
+
+    def line_fragments(self, path, lineno: int) -> Optional[list]:
+        """Fragments of the line without its line break, highlighted if its file is."""
+        source = source_cache.get(path)
+        if not source:
+            return None
+        highlighted = highlight_cache.peek(source)
+        origin = highlighted or source
+        key = (source.path, lineno)
+        cached = self._lines.get(key)
+        if cached and cached[0] is origin:
+            self._lines.move_to_end(key)
+            return cached[1]
+        if highlighted:
+            if not 0 < lineno <= highlighted.line_count:
+                return None
+            fragments = PygmentsTokens(highlighted.lines[lineno - 1]).__pt_formatted_text__()
         else:
-            break
-    if tokens_to_remove:
-        return filtered_token[:-tokens_to_remove]
-    return filtered_token
-
-
-def get_pygments_token_from_file(current_lineno, source_file):
-    token = get_robot_token_from_file(Path(source_file))
-    pygments_token = list(RobotFrameworkLocalLexer().get_pygments_token(token))
-    return prefix_line_numbers_and_position(pygments_token, current_lineno)
-
-
-def prefix_line_numbers_and_position(token: List[Tuple], lineno):
-    """prefix each line with a pygment token of line number and add an arrow in the line of lineno"""
-    line_number = 1
-    yield LINE_NO_TOKEN, f"{line_number:>3}   "
-    for tok, val in token:
-        yield tok, val
-        if val == "\n":
-            line_number += 1
-            if line_number == lineno:
-                yield LINE_NO_TOKEN, f"{line_number:>3} ->"
-            else:
-                yield LINE_NO_TOKEN, f"{line_number:>3}   "
-
-
-def _find_last_lineno(lines, begin_lineno):
-    line_index = begin_lineno - 1
-    while line_index < len(lines):
-        line = lines[line_index]
-        if not _inside_test_case_block(line):
-            break
-        line_index += 1
-    return line_index
-
-
-def _find_first_lineno(lines, begin_lineno):
-    line_index = begin_lineno - 1
-    while line_index >= 0:
-        line_index -= 1
-        line = lines[line_index]
-        if not _inside_test_case_block(line):
-            break
-    return line_index
-
-
-def _inside_test_case_block(line):
-    if line.startswith(" "):
-        return True
-    if line.startswith("\t"):
-        return True
-    if line.startswith("#"):
-        return True
-    return False
-
-
-def _print_lines(lines, start_index, end_index, current_lineno):
-    display_lines = lines[start_index:end_index]
-    for lineno, line in enumerate(display_lines, start_index + 1):
-        current_line_sign = ""
-        if lineno == current_lineno:
-            current_line_sign = "->"
-        print_output(f"{lineno:>3} {current_line_sign:2}\t", f"{line.rstrip()}")
+            line = source.line(lineno)
+            if line is None:
+                return None
+            fragments = [("", line)]
+        while fragments and not fragments[-1][1].strip():
+            fragments.pop()
+        if fragments:
+            fragments[-1] = (fragments[-1][0], fragments[-1][1].rstrip())
+        self._lines[key] = (origin, fragments)
+        while len(self._lines) > self.size:
+            self._lines.popitem(last=False)
+        return fragments
+
+    def render(self, path, lineno: int) -> FormattedText:
+        fragments = [
+            ("class:head", " "),
+            ("class:location", f"{self.relative_path(path)}:{lineno}"),
+        ]
+        line = self.line_fragments(path, lineno)
+        if line is not None:
+            fragments.append(("", "\n"))
+            fragments.append(("class:head", f"{lineno} -> "))
+            fragments.extend(line)
+        return FormattedText(fragments)
+
+    def print_step(self, path, lineno: int):
+        print_fragments(self.render(path, lineno), STEP_STYLE)
+
+
+step_renderer = StepRenderer()
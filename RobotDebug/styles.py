@@ -1,7 +1,21 @@
+from typing import Dict, Hashable, List, Tuple
+
 from prompt_toolkit import print_formatted_text
+from prompt_toolkit.application import get_app_or_none, get_app_session
 from prompt_toolkit.completion import Completion
 from prompt_toolkit.formatted_text import FormattedText, PygmentsTokens
-from prompt_toolkit.styles import Style, merge_styles, style_from_pygments_cls
+from prompt_toolkit.renderer import (
+    print_formatted_text as renderer_print_formatted_text,
+)
+from prompt_toolkit.styles import (
+    Attrs,
+    BaseStyle,
+    Style,
+    default_pygments_style,
+    default_ui_style,
+    merge_styles,
+    style_from_pygments_cls,
+)
 from pygments.styles import get_all_styles, get_style_by_name
 
 NORMAL_STYLE = Style.from_dict(
@@ -11,13 +25,6 @@ NORMAL_STYLE = Style.from_dict(
     }
 )
 
-LOW_VISIBILITY_STYLE = Style.from_dict(
-    {
-        "head": "fg:blue",
-        "message": "fg:#333333",
-    }
-)
-
 ERROR_STYLE = Style.from_dict({"head": "fg:red"})
 
 
@@ -40,6 +47,53 @@ DEBUG_PROMPT_STYLE = merge_styles(
 )
 
 
+class CachedStyle(BaseStyle):
+    """A style merged with the default styles once, that remembers resolved style strings.
+
+    ``print_formatted_text`` merges the given style with the default styles
+    and resolves every style string again on each call, which takes
+    milliseconds with a Pygments style. Output printed often, like the
+    location of every step, is printed with ``print_fragments`` instead.
+    """
+
+    def __init__(self, style: BaseStyle):
+        self.style = style
+        self._merged = merge_styles([default_ui_style(), default_pygments_style(), style])
+        self._attrs: Dict[str, Attrs] = {}
+
+    def get_attrs_for_style_str(self, style_str: str, default: Attrs = None) -> Attrs:
+        attrs = self._attrs.get(style_str)
+        if attrs is None:
+            attrs = self._attrs[style_str] = self._merged.get_attrs_for_style_str(style_str)
+        return attrs
+
+    @property
+    def style_rules(self) -> List[Tuple[str, str]]:
+        return self._merged.style_rules
+
+    def invalidation_hash(self) -> Hashable:
+        return self._merged.invalidation_hash()
+
+
+STEP_STYLE = CachedStyle(
+    merge_styles(
+        [
+            DEBUG_PROMPT_STYLE,
+            Style.from_dict({"head": "fg:blue", "location": "fg:#333333"}),
+        ]
+    )
+)
+
+
+def print_fragments(fragments, style: CachedStyle):
+    """Print prompt-toolkit fragments followed by a line break in one write."""
+    if get_app_or_none() is not None:
+        print_formatted_text(fragments, style=style.style)
+        return
+    output = get_app_session().output
+    renderer_print_formatted_text(output, [*fragments, ("", "\n")], style)
+
+
 def get_pygments_styles():
     """Get all pygments styles."""
     return list(get_all_styles())
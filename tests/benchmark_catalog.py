@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Compare building keyword specs with building Libdoc models of a large library.
+
+Usage: python -m tests.benchmark_catalog [number_of_keywords]
+
+Generates a library with ``number_of_keywords`` keywords having typed
+arguments and multi paragraph documentation, imports it like Robot Framework
+does and measures the build time and the memory kept by the result for the
+Libdoc model, which the catalog used before, and for the keyword specs.
+"""
+
+import gc
+import importlib
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from robot.libdocpkg.model import LibraryDoc
+from robot.libdocpkg.robotbuilder import KeywordDocBuilder, LibraryDocBuilder
+from robot.running import TestLibrary as ImportedLibrary
+
+from RobotDebug.globals import IS_RF_7
+from RobotDebug.keywordcache import LibrarySpec
+
+KEYWORD_TEMPLATE = '''
+def keyword_number_{index}(locator: str, timeout: float = 5.0, *, mode: Mode = Mode.FAST,
+                           retries: int = 3) -> str:
+    """Performs the action number {index} on the element found by ``locator``.
+
+    Waits at most ``timeout`` seconds. With ``mode`` ``SLOW`` every step is logged,
+    failed attempts are retried ``retries`` times.
+
+    Example:
+    | `Keyword Number {index}` | id:submit | timeout=10 |
+    | `Keyword Number {index}` | css:.item | mode=SLOW  |
+    """
+    return locator
+'''
+LIBRARY_HEADER = '''
+from enum import Enum
+
+
+class Mode(Enum):
+    """How fast actions are performed."""
+
+    FAST = 1
+    SLOW = 2
+'''
+
+
+def build_libdoc(lib):
+    """The Libdoc model of an imported library, as the catalog built it before."""
+    builder = LibraryDocBuilder()
+    libdoc = LibraryDoc(
+        doc=builder._get_doc(lib),
+        version=lib.version,
+        scope=str(lib.scope),
+        doc_format=lib.doc_format,
+        source=lib.source,
+        lineno=lib.lineno,
+        name=lib.name,
+    )
+    libdoc.inits = builder._get_initializers(lib)
+    libdoc.keywords = KeywordDocBuilder().build_keywords(lib)
+    libdoc.type_docs = builder._get_type_docs(libdoc.inits + libdoc.keywords, lib.converters)
+    return libdoc
+
+
+def import_library(directory, number):
+    source = Path(directory, "LargeLibrary.py")
+    source.write_text(
+        LIBRARY_HEADER + "".join(KEYWORD_TEMPLATE.format(index=index) for index in range(number))
+    )
+    sys.path.insert(0, directory)
+    importlib.invalidate_caches()
+    if IS_RF_7:
+        return ImportedLibrary.from_name("LargeLibrary")
+    return ImportedLibrary("LargeLibrary")
+
+
+def measure(build, lib):
+    """Best build time of three in seconds and bytes of memory kept by the result."""
+    seconds = min(timeit.repeat(lambda: build(lib), number=1, repeat=3))
+    gc.collect()
+    tracemalloc.start()
+    result = build(lib)
+    gc.collect()
+    kept = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return seconds, kept
+
+
+def main(number=3000):
+    with tempfile.TemporaryDirectory() as directory:
+        lib = import_library(directory, number)
+        libdoc_time, libdoc_memory = measure(build_libdoc, lib)
+        spec_time, spec_memory = measure(LibrarySpec.from_library, lib)
+    print(f"{number} keywords")
+    print(f"{'':<10} {'build s':>10} {'memory MB':>10}")
+    print(f"{'libdoc':<10} {libdoc_time:>10.3f} {libdoc_memory / 1e6:>10.2f}")
+    print(f"{'specs':<10} {spec_time:>10.3f} {spec_memory / 1e6:>10.2f}")
+    print(f"{'ratio':<10} {libdoc_time / spec_time:>9.1f}x {libdoc_memory / spec_memory:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Measure the keyword completion latency with a large synthetic catalog.
+
+Usage: python -m tests.benchmark_completion [number_of_keywords]
+
+Builds a catalog of ``number_of_keywords`` keywords spread over 40 libraries
+and compares the completer, which uses a prefix index and ranks at most
+``MAX_COMPLETIONS`` fuzzy matches, with a linear prefix scan of all names.
+"""
+
+import random
+import sys
+import time
+import timeit
+from types import SimpleNamespace
+
+from prompt_toolkit.document import Document
+
+from RobotDebug.cmdcompleter import CmdCompleter, KeywordAutoSuggestion
+from RobotDebug.robotkeyword import normalize_kw
+
+WORDS = [
+    "Click", "Button", "Element", "Should", "Be", "Visible", "Get", "Text", "Wait", "Until",
+    "Page", "Contains", "Input", "Password", "Select", "From", "List", "Open", "Close", "Browser",
+]  # fmt: skip
+LIBRARIES = 40
+QUERIES = ["c", "click", "click bu", "click btn", "sbv", "should be vis", "lib7.wait un", "zzz"]
+
+
+def synthetic_catalog(number):
+    rng = random.Random(42)
+    libs = [SimpleNamespace(name=f"Lib{index}", version="1.0") for index in range(LIBRARIES)]
+    keywords, commands = [], []
+    for index in range(number):
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" {index}"
+        lib = libs[index % LIBRARIES]
+        doc = " ".join(rng.sample(WORDS, 5)).capitalize() + "."
+        keywords.append(SimpleNamespace(name=name, parent=lib, args="", short_doc=doc))
+        commands.append((f"{lib.name}.{name}", name, "()"))
+        commands.append((name, name, f"() [{lib.name}]"))
+    return SimpleNamespace(generation=1, libs=libs, keywords=keywords, commands=commands)
+
+
+def linear_scan(names, text):
+    return [
+        name
+        for name in names
+        if (("." not in name and "." not in text) or ("." in name and "." in text))
+        and normalize_kw(name).startswith(normalize_kw(text))
+    ]
+
+
+def per_query(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(number=20_000):
+    completer = CmdCompleter(synthetic_catalog(number), [])
+    start = time.perf_counter()
+    completer.update()
+    print(f"{number} keywords, indexed in {time.perf_counter() - start:.2f} s")
+    print(f"{'query':<16} {'matches':>8} {'linear ms':>10} {'index ms':>10}  best match")
+    for text in QUERIES:
+        matches = list(completer._get_command_completions(text))
+        linear = per_query(lambda text=text: linear_scan(completer.names, text))
+        indexed = per_query(lambda text=text: list(completer._get_command_completions(text)))
+        print(
+            f"{text!r:<16} {len(matches):>8} {linear * 1e3:>10.3f} {indexed * 1e3:>10.3f}"
+            f"  {matches[0].text if matches else ''}"
+        )
+    suggestion = KeywordAutoSuggestion(completer)
+    for text in ["Click Bu", "${x} =    Should Be Vis"]:
+        # A new document per call, the remembered last suggestion would make it free.
+        seconds = per_query(
+            lambda text=text: [
+                suggestion.get_suggestion(None, Document(text + end)) for end in "ab"
+            ]
+        )
+        print(f"suggestion {text!r}: {seconds / 2 * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Measure the per keyword overhead of the RobotDebug listener.
+
+Usage: python -m tests.benchmark_listener [number_of_keywords]
+
+Calls ``start_keyword``/``end_keyword`` the way Robot Framework does for
+every executed keyword and compares it to a listener that does nothing.
+"""
+
+import sys
+import timeit
+
+from RobotDebug import Listener, RobotDebug
+
+ATTRS = {
+    "kwname": "Log",
+    "libname": "BuiltIn",
+    "args": ["hello"],
+    "assign": [],
+    "tags": [],
+    "type": "KEYWORD",
+    "status": "PASS",
+    "elapsedtime": 0,
+    "source": "/tmp/suite.robot",
+    "lineno": 12,
+}
+
+
+class NullListener:
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def start_keyword(self, name, attrs):
+        pass
+
+    def end_keyword(self, name, attrs):
+        pass
+
+
+def per_call(listener, number):
+    start, end = listener.start_keyword, listener.end_keyword
+
+    def keyword():
+        start("BuiltIn.Log", ATTRS)
+        end("BuiltIn.Log", ATTRS)
+
+    return min(timeit.repeat(keyword, number=number, repeat=5)) / number
+
+
+def main(number=1_000_000):
+    library = RobotDebug()
+    results = {
+        "no listener": per_call(NullListener(), number),
+        "library listener": per_call(Listener(library=library, is_library=True), number),
+        "cli listener": per_call(Listener(library=library), number),
+        "with breakpoints": per_call(
+            Listener("breakpoint=other.robot:99", "breakpoint=Click", library=library), number
+        ),
+    }
+    baseline = results["no listener"]
+    for name, seconds in results.items():
+        print(
+            f"{name:<18} {seconds * 1e9:8.1f} ns/keyword"
+            f"   overhead {(seconds - baseline) * 1e9:8.1f} ns"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,118 @@
+import unittest
+from pathlib import Path
+
+from RobotDebug.breakpoints import BreakpointTable
+
+
+def attrs(source, lineno, kwname="Log"):
+    return {"source": source, "lineno": lineno, "kwname": kwname}
+
+
+class BreakpointTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = BreakpointTable()
+        self.source = str(Path("/suites/login.robot").absolute())
+
+    def test_location_breakpoint(self):
+        point = self.table.add("login.robot:42")
+        assert self.table.match("BuiltIn.Log", attrs(self.source, 42)) is point
+        assert self.table.match("BuiltIn.Log", attrs(self.source, 41)) is None
+        assert self.table.match("BuiltIn.Log", attrs("/suites/other_login.robot", 42)) is None
+
+    def test_absolute_location_breakpoint(self):
+        point = self.table.add(f"{self.source}:3")
+        assert self.table.match("BuiltIn.Log", attrs(self.source, 3)) is point
+        assert self.table.match("BuiltIn.Log", attrs("/other/suites/login.robot", 3)) is None
+
+    def test_keyword_breakpoint(self):
+        point = self.table.add("log to_console")
+        assert (
+            self.table.match("BuiltIn.Log To Console", attrs(None, None, "Log To Console")) is point
+        )
+        assert self.table.match("BuiltIn.Log", attrs(None, None, "Log")) is None
+        assert self.table.add("BuiltIn.Log").keyword == "BuiltIn.Log"
+        assert self.table.match("BuiltIn.Log", attrs(None, None, "Log")) is not None
+
+    def test_remove(self):
+        location = self.table.add("login.robot:42")
+        keyword = self.table.add("Log")
+        self.table.remove(location.number)
+        self.table.remove(keyword.number)
+        assert not self.table
+        assert self.table.match("BuiltIn.Log", attrs(self.source, 42)) is None
+
+    def test_keyword_breakpoint_replaces_previous_one(self):
+        first = self.table.add("Log")
+        second = self.table.add("log    after 2 hits")
+        assert list(self.table) == [second]
+        assert self.table.match("BuiltIn.Log", attrs(None, None, "Log")) is second
+        self.table.remove(second.number)
+        assert not self.table
+        assert self.table.match("BuiltIn.Log", attrs(None, None, "Log")) is None
+        assert first.number not in self.table.breakpoints
+
+    def test_empty_spec(self):
+        with self.assertRaises(ValueError):
+            self.table.add("  ")
+
+    def test_invalid_spec(self):
+        with self.assertRaisesRegex(ValueError, "Invalid breakpoint"):
+            self.table.add("Log\nNo Operation")
+
+
+class ConditionalBreakpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = BreakpointTable()
+
+    def test_condition(self):
+        point = self.table.add("login.robot:42 if ${retry} > 3 and $user.startswith('adm')")
+        assert str(point.condition) == "${retry} > 3 and $user.startswith('adm')"
+        assert not point.should_stop({"retry": 3, "user": "admin"})
+        assert point.should_stop({"retry": 4, "user": "admin"})
+        assert point.hits == 1
+
+    def test_extended_variable_syntax(self):
+        point = self.table.add("Log    if ${response.status} == 500 and ${items}[0] == 'a'")
+        response = type("Response", (), {"status": 500})()
+        assert point.keyword == "Log"
+        assert point.should_stop({"response": response, "items": ["a"]})
+
+    def test_after_hits(self):
+        point = self.table.add("Log    after 2 hits")
+        assert point.after == 2
+        assert [point.should_stop({}) for _ in range(4)] == [False, False, True, True]
+
+    def test_condition_and_hits(self):
+        point = self.table.add("login.robot:1 if $i % 2 after 1 hit")
+        assert [point.should_stop({"i": i}) for i in range(6)] == [
+            False,
+            False,
+            False,
+            True,
+            False,
+            True,
+        ]
+
+    def test_failing_condition_stops(self):
+        point = self.table.add("Log    if ${missing} > 1")
+        assert point.should_stop({})
+        assert point.error == "KeyError: 'missing'"
+
+    def test_invalid_condition(self):
+        with self.assertRaises(SyntaxError):
+            self.table.add("Log    if ${a} >")
+
+    def test_keyword_names_containing_if_and_after(self):
+        for name in ["Run Keyword If Test Failed", "Click Element If Visible", "Wait after Save"]:
+            point = self.table.add(name)
+            assert point.keyword == name
+            assert point.condition is None
+            assert point.after == 0
+        point = self.table.add("Run Keyword If\tif $i > 3    after 2 hits")
+        assert point.keyword == "Run Keyword If"
+        assert str(point.condition) == "$i > 3"
+        assert point.after == 2
+
+    def test_separator_without_option(self):
+        with self.assertRaises(ValueError):
+            self.table.add("Run Keyword If    1")
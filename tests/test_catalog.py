@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from RobotDebug.catalog import KeywordCatalog, PrefixIndex
+
+
+def library(name, *keywords):
+    lib = SimpleNamespace(name=name, version="1.0")
+    lib.keywords = [SimpleNamespace(name=kw, parent=lib, args="") for kw in keywords]
+    return lib
+
+
+class KeywordCatalogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.libs = [library("BuiltIn", "Log", "No Operation")]
+        self.built = []
+        for name, replacement in [
+            ("get_libs", lambda: list(self.libs)),
+            ("get_lib_keywords", self.get_lib_keywords),
+        ]:
+            patcher = patch(f"RobotDebug.catalog.{name}", replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.catalog = KeywordCatalog()
+
+    def get_lib_keywords(self, lib):
+        self.built.append(lib.name)
+        return lib.keywords
+
+    def test_refresh_builds_commands_once(self):
+        assert self.catalog.refresh()
+        assert not self.catalog.refresh()
+        assert self.built == ["BuiltIn"]
+        assert self.catalog.generation == 1
+        names = [name for name, _, _ in self.catalog.commands]
+        assert names == ["BuiltIn", "BuiltIn.Log", "Log", "BuiltIn.No Operation", "No Operation"]
+        assert self.catalog.keywords_catalog["builtin.nooperation"].name == "No Operation"
+
+    def test_only_new_libraries_are_built(self):
+        self.catalog.refresh()
+        self.libs.append(library("String", "Split String"))
+        assert self.catalog.refresh()
+        assert self.built == ["BuiltIn", "String"]
+        assert self.catalog.generation == 2  # noqa: PLR2004
+        assert "splitstring" in self.catalog.keywords_catalog
+
+    def test_refresh_with_given_libraries(self):
+        string = library("String", "Split String")
+        assert self.catalog.refresh([string])
+        assert self.catalog.libs == [string]
+        assert not self.catalog.refresh([string])
+        assert self.built == ["String"]
+
+    def test_invalidate_rebuilds_all(self):
+        self.catalog.refresh()
+        self.catalog.invalidate()
+        assert self.catalog.refresh()
+        assert self.built == ["BuiltIn", "BuiltIn"]
+
+
+class PrefixIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = PrefixIndex(
+            ["Log", "Log Many", "log_variables", "BuiltIn.Log", "BuiltIn.Log Many", "Login"]
+        )
+
+    def test_normalized_prefix(self):
+        assert list(self.index.search("log m")) == ["Log Many"]
+        assert list(self.index.search("LOG")) == ["Log", "Login", "Log Many", "log_variables"]
+        assert list(self.index.search("log v")) == ["log_variables"]
+        assert list(self.index.search("x")) == []
+
+    def test_dotted_names_only_match_dotted_text(self):
+        assert list(self.index.search("builtin.log ")) == ["BuiltIn.Log", "BuiltIn.Log Many"]
+        assert list(self.index.search("builtin")) == []
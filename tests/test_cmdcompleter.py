@@ -0,0 +1,119 @@
+import unittest
+from types import SimpleNamespace
+
+from prompt_toolkit.document import Document
+from prompt_toolkit.history import InMemoryHistory
+
+from RobotDebug.catalog import PrefixIndex
+from RobotDebug.cmdcompleter import (
+    CmdCompleter,
+    FuzzyIndex,
+    KeywordAutoSuggestion,
+    get_completion_index,
+)
+
+KEYWORDS = [
+    ("Click Button", "SeleniumLibrary", "Clicks the button identified by locator."),
+    ("Click Element", "SeleniumLibrary", "Click the element identified by locator."),
+    ("Should Be Equal", "BuiltIn", "Fails if the given objects are unequal."),
+    ("Log", "BuiltIn", "Logs the given message with the given level."),
+    ("Button Should Be Visible", "Browser", "Verifies that the button is visible."),
+]
+
+
+class FuzzyIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        entries = []
+        for name, lib, doc in KEYWORDS:
+            entries.append((f"{lib}.{name}", name, lib, doc))
+            entries.append((name, name, lib, doc))
+        self.index = FuzzyIndex(entries)
+
+    def test_subsequence_of_words(self):
+        assert self.index.search("click btn") == ["Click Button"]
+        assert self.index.search("btn") == ["Click Button", "Button Should Be Visible"]
+
+    def test_prefix_ranks_first(self):
+        assert self.index.search("click") == ["Click Button", "Click Element"]
+        assert self.index.search("butt")[0] == "Button Should Be Visible"
+
+    def test_initials(self):
+        assert self.index.search("sbe") == ["Should Be Equal"]
+
+    def test_library_and_doc_words(self):
+        assert self.index.search("selenium click") == ["Click Button", "Click Element"]
+        assert self.index.search("unequal") == ["Should Be Equal"]
+
+    def test_all_words_have_to_match(self):
+        assert self.index.search("click zzz") == []
+
+    def test_dotted_names_match_library_prefix(self):
+        assert self.index.search("selenium.btn") == ["SeleniumLibrary.Click Button"]
+        assert self.index.search("builtin.btn") == []
+
+    def test_limit(self):
+        assert len(self.index.search("c", limit=1)) == 1
+
+
+class KeywordAutoSuggestionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.history = InMemoryHistory()
+        self.completer = SimpleNamespace(
+            index=PrefixIndex(["Log", "Log Many", "Log To Console", "BuiltIn.Log To Console"])
+        )
+        self.suggestion = KeywordAutoSuggestion(self.completer, self.history)
+
+    def suggest(self, text):
+        return self.suggestion.get_suggestion(None, Document(text)).text
+
+    def test_keyword_in_keyword_position(self):
+        assert self.suggest("Log M") == "any"
+        assert self.suggest("log to") == " Console"
+        assert self.suggest("${x} =    Log T") == "o Console"
+        assert self.suggest("FOR    ${x}    IN    a\n    BuiltIn.Log T") == "o Console"
+
+    def test_no_keyword_in_argument_position(self):
+        assert self.suggest("Log    Log T") == ""
+        assert self.suggest("") == ""
+
+    def test_most_recent_history_line_wins(self):
+        self.history.append_string("Log    first")
+        self.history.append_string("Log    second")
+        assert self.suggest("Log  ") == "  second"
+        assert self.suggest("Log    f") == "irst"
+        self.history.append_string("Log    fresh")
+        self.suggestion.reset()
+        assert self.suggest("Log    f") == "resh"
+
+    def test_last_suggestion_is_remembered(self):
+        assert self.suggest("Log M") == "any"
+        self.completer.index = PrefixIndex(["Log Message"])
+        assert self.suggest("Log M") == "essage"
+
+
+class CompletionIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        lib = SimpleNamespace(name="BuiltIn")
+        keyword = SimpleNamespace(name="Log", parent=lib, short_doc="Logs.")
+        self.catalog = SimpleNamespace(
+            generation=1,
+            libs=[lib],
+            keywords=[keyword],
+            commands=[("BuiltIn.Log", "Log", "()"), ("Log", "Log", "() [BuiltIn]")],
+        )
+        self.helps = [("help", "Show help message.")]
+
+    def test_index_is_shared_by_completers(self):
+        first = CmdCompleter(self.catalog, self.helps)
+        first.update()
+        second = CmdCompleter(self.catalog, list(self.helps))
+        second.update()
+        assert second.index is first.index
+        assert list(second.index.search("lo")) == ["Log"]
+        assert second.display_metas["help"] == "DEBUG command: Show help message."
+
+    def test_index_is_rebuilt_for_new_generation(self):
+        index = get_completion_index(self.catalog, self.helps)
+        assert get_completion_index(self.catalog, self.helps) is index
+        self.catalog.generation = 2
+        assert get_completion_index(self.catalog, self.helps) is not index
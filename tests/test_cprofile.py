@@ -0,0 +1,68 @@
+import pstats
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from RobotDebug import debugcmd
+from RobotDebug.debugcmd import CPROFILE_OPTION, cprofile_command, parse_options
+
+DEFAULTS = {"sort": "cumtime", "top": "30", "dump": None}
+
+
+def profiled_function():
+    return sum(range(1000))
+
+
+class CprofileOptionsTestCase(unittest.TestCase):
+    def test_options_in_any_order(self):
+        options, command = parse_options(
+            CPROFILE_OPTION, "--top 5  --dump out.pstats --sort tottime Log    hello", DEFAULTS
+        )
+        assert options == {"sort": "tottime", "top": "5", "dump": "out.pstats"}
+        assert command == "Log    hello"
+
+    def test_defaults_and_options_after_the_keyword(self):
+        options, command = parse_options(CPROFILE_OPTION, " Log    --top 5 ", DEFAULTS)
+        assert options == DEFAULTS
+        assert command == "Log    --top 5"
+        assert DEFAULTS["top"] == "30"
+
+
+class CprofileCommandTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.printed = []
+        for name in ["print_output", "print_error"]:
+            patcher = patch.object(
+                debugcmd, name, lambda head, message: self.printed.append((head, message))
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_profiled(self, dump, fail=False):
+        def run_command(dbg_cmd, command):
+            profiled_function()
+            if fail:
+                raise RuntimeError("keyword failed")
+            return [("<", command)]
+
+        with patch.object(debugcmd, "run_command", run_command):
+            return cprofile_command(None, "Log    hello", "tottime", 5, dump)
+
+    def test_statistics_are_printed_and_dumped(self):
+        dump = str(self.directory / "out.pstats")
+        assert self.run_profiled(dump) == [("<", "Log    hello")]
+        assert any("profiled_function" in message for _, message in self.printed)
+        assert self.printed[-1] == ("<", f"Profile written to {dump}")
+        functions = [function for _, _, function in pstats.Stats(dump).stats]
+        assert "profiled_function" in functions
+
+    def test_unwritable_dump_keeps_the_keyword_error(self):
+        dump = str(self.directory / "missing" / "out.pstats")
+        with self.assertRaisesRegex(RuntimeError, "keyword failed"):
+            self.run_profiled(dump, fail=True)
+        assert any("profiled_function" in message for _, message in self.printed)
+        assert self.printed[-1][0] == "! Profile not written:"
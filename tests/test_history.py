@@ -0,0 +1,133 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from prompt_toolkit.history import FileHistory, InMemoryHistory
+
+from RobotDebug import history as history_module
+from RobotDebug.history import HistoryIndex, SQLiteHistory, get_history_index
+
+
+def load(history):
+    async def collect():
+        return [item async for item in history.load()]
+
+    return asyncio.run(collect())
+
+
+class HistoryIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = HistoryIndex(
+            ["Log    one", "FOR    ${x}    IN    a\n    Log    ${x}\nEND", "Log    two"]
+        )
+
+    def test_most_recent_line_with_prefix(self):
+        assert self.index.find_line("Log  ") == "Log    two"
+        assert self.index.find_line("Log    o") == "Log    one"
+        assert self.index.find_line("    Log") == "    Log    ${x}"
+        assert self.index.find_line("END") == "END"
+        assert self.index.find_line("Missing") is None
+        assert self.index.find_line("") is None
+
+    def test_most_recent_commands_containing_text(self):
+        assert self.index.search("Log") == [
+            "Log    two",
+            "FOR    ${x}    IN    a\n    Log    ${x}\nEND",
+            "Log    one",
+        ]
+        assert self.index.search("o", limit=2) == [
+            "Log    two",
+            "FOR    ${x}    IN    a\n    Log    ${x}\nEND",
+        ]
+        assert self.index.search("Log    one") == ["Log    one"]
+        assert self.index.search("missing") == []
+
+    def test_index_is_built_again_when_history_changed(self):
+        history = InMemoryHistory()
+        history.append_string("Log    one")
+        index = get_history_index(history)
+        assert get_history_index(history) is index
+        history.append_string("Log    two")
+        assert get_history_index(history).find_line("Log") == "Log    two"
+
+
+class SQLiteHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.path = str(self.directory / "history.db")
+
+    def history(self, *args, **kwargs):
+        history = SQLiteHistory(*args, **kwargs)
+        self.addCleanup(history.close)
+        return history
+
+    def test_commands_are_stored_once(self):
+        history = self.history(self.path)
+        for command in ["Log    1", "Log    2", "Log    1", "_private"]:
+            history.append_string(command)
+        assert history.get_strings() == ["Log    2", "Log    1"]
+        assert load(self.history(self.path)) == ["Log    1", "Log    2"]
+
+    def test_oldest_commands_are_deleted(self):
+        history = self.history(self.path, max_size=3)
+        with patch.object(history_module, "COMPACT_INTERVAL", 2):
+            for number in range(6):
+                history.append_string(f"Log    {number}")
+        assert history.get_strings() == ["Log    3", "Log    4", "Log    5"]
+        assert load(self.history(self.path, max_size=10)) == ["Log    5", "Log    4", "Log    3"]
+
+    def test_reloaded_when_stored_elsewhere(self):
+        history = self.history(self.path)
+        other = self.history(self.path)
+        history.append_string("Log    mine")
+        assert load(history) == ["Log    mine"]
+        assert load(history) == ["Log    mine"]
+        other.append_string("Log    other")
+        assert load(history) == ["Log    other", "Log    mine"]
+
+    def test_index_is_built_again_when_reloaded(self):
+        history = self.history(self.path)
+        other = self.history(self.path)
+        for command in ["Log    a", "Log    b", "Log    c"]:
+            history.append_string(command)
+        assert get_history_index(history).search("Log") == ["Log    c", "Log    b", "Log    a"]
+        other.append_string("Log    a")
+        other.append_string("Log    c")
+        load(history)
+        assert get_history_index(history).search("Log") == ["Log    c", "Log    a", "Log    b"]
+
+    def test_concurrent_writers(self):
+        def write(name):
+            history = SQLiteHistory(self.path)
+            for number in range(50):
+                history.append_string(f"Log    {name} {number}")
+            history.close()
+
+        writers = [threading.Thread(target=write, args=(name,)) for name in "abcd"]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        assert len(set(load(self.history(self.path)))) == 200
+
+    def test_legacy_history_is_imported(self):
+        legacy = str(self.directory / "history")
+        file_history = FileHistory(legacy)
+        for command in ["Log    1", "Log    2", "Log    1"]:
+            file_history.store_string(command)
+        assert load(self.history(self.path, legacy)) == ["Log    1", "Log    2"]
+        assert load(self.history(legacy)) == ["Log    1", "Log    2"]
+        assert Path(f"{legacy}.db").is_file()
+
+    def test_kept_in_memory_without_database(self):
+        blocker = self.directory / "file"
+        blocker.touch()
+        history = self.history(str(blocker / "history.db"))
+        history.append_string("Log    1")
+        assert load(history) == ["Log    1"]
+        assert history.path is None
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from robot.running import ResourceFile
+from robot.running import TestLibrary as ImportedLibrary
+
+from RobotDebug.globals import IS_RF_7
+from RobotDebug.keywordcache import (
+    ArgumentsSpec,
+    KeywordCache,
+    KeywordSpec,
+    LibrarySpec,
+)
+
+
+class KeywordCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name)
+        self.source = self.path / "MyLibrary.py"
+        self.source.write_text("")
+        self.lib = SimpleNamespace(
+            name="MyLibrary",
+            version="1.0",
+            source=str(self.source),
+            init=SimpleNamespace(positional=["a"], named={}),
+        )
+        self.built = []
+        self.lock = threading.Lock()
+
+    def build(self, lib):
+        with self.lock:
+            self.built.append(lib.name)
+        spec = LibrarySpec(lib)
+        args = ArgumentsSpec("text, level=INFO", ("text", "level"), (), {"level": "INFO"})
+        spec.keywords = [KeywordSpec(spec, f"Log {len(self.built)}", args, "Logs.")]
+        return spec
+
+    def cache(self):
+        return KeywordCache(str(self.path / "cache"))
+
+    def test_spec_is_loaded_from_disk(self):
+        self.cache().get(self.lib, self.build)
+        spec = self.cache().get(self.lib, self.build)
+        assert self.built == ["MyLibrary"]
+        keyword = spec.keywords[0]
+        assert keyword.parent is spec
+        assert (keyword.name, keyword.short_doc) == ("Log 1", "Logs.")
+        assert str(keyword.args) == "text, level=INFO"
+        assert keyword.args.positional_or_named == ("text", "level")
+        assert keyword.args.defaults == {"level": "INFO"}
+
+    def test_import_arguments_use_own_file(self):
+        self.cache().get(self.lib, self.build)
+        self.lib.init = SimpleNamespace(positional=["b"], named={})
+        self.cache().get(self.lib, self.build)
+        assert self.built == ["MyLibrary", "MyLibrary"]
+
+    def test_stale_spec_is_returned_and_rebuilt_in_background(self):
+        self.cache().get(self.lib, self.build)
+        stat = self.source.stat()
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache = self.cache()
+        assert cache.get(self.lib, self.build).keywords[0].name == "Log 1"
+        for thread in threading.enumerate():
+            if thread.name == "RobotDebug keyword cache":
+                thread.join()
+        assert cache.updates == 1
+        assert cache.pop_rebuilt(self.lib).keywords[0].name == "Log 2"
+        assert cache.pop_rebuilt(self.lib) is None
+        assert self.cache().get(self.lib, self.build).keywords[0].name == "Log 2"
+
+    def test_package_is_rebuilt_when_submodule_changes(self):
+        package = self.path / "MyPackage"
+        (package / "keywords").mkdir(parents=True)
+        (package / "__init__.py").write_text("from .keywords.actions import *\n")
+        module = package / "keywords" / "actions.py"
+        module.write_text("def first(): pass\n")
+        self.lib.source = str(package / "__init__.py")
+        self.cache().get(self.lib, self.build)
+        module.write_text("def second(): pass\n")
+        stat = module.stat()
+        os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache = self.cache()
+        assert cache.get(self.lib, self.build).keywords[0].name == "Log 1"
+        for thread in threading.enumerate():
+            if thread.name == "RobotDebug keyword cache":
+                thread.join()
+        assert cache.updates == 1
+        assert self.cache().get(self.lib, self.build).keywords[0].name == "Log 2"
+
+    def test_libraries_without_source_are_not_cached(self):
+        self.lib.source = None
+        self.cache().get(self.lib, self.build)
+        self.cache().get(self.lib, self.build)
+        assert self.built == ["MyLibrary", "MyLibrary"]
+
+    def test_disabled_cache_always_builds(self):
+        cache = KeywordCache("")
+        cache.get(self.lib, self.build)
+        cache.get(self.lib, self.build)
+        assert self.built == ["MyLibrary", "MyLibrary"]
+
+
+class LibrarySpecTestCase(unittest.TestCase):
+    def test_specs_are_built_from_imported_library(self):
+        lib = ImportedLibrary.from_name("String") if IS_RF_7 else ImportedLibrary("String")
+        spec = LibrarySpec.from_library(lib)
+        names = [keyword.name for keyword in spec.keywords]
+        assert names == sorted(names, key=str.lower)
+        keyword = next(keyword for keyword in spec.keywords if keyword.name == "Split String")
+        assert keyword.parent is spec
+        assert (
+            keyword.short_doc == "Splits the ``string`` using ``separator`` as a delimiter string."
+        )
+        assert keyword.args.positional_or_named == ("string", "separator", "max_split")
+        assert keyword.args.defaults == {"separator": "None", "max_split": "-1"}
+        assert str(keyword.args) == "string, separator=None, max_split=-1"
+        assert keyword.doc.startswith(keyword.short_doc)
+        assert "Split String From Right" in keyword.doc
+
+    @unittest.skipUnless(IS_RF_7, "ResourceFile.from_string requires Robot Framework 7")
+    def test_embedded_arguments_are_not_completed(self):
+        resource = ResourceFile.from_string(
+            "*** Keywords ***\nSelect ${animal} From ${place}\n    [Arguments]    ${count}\n"
+            "    [Documentation]    Selects one.\n    ...\n    ...    More.\n    No Operation\n"
+        )
+        spec = LibrarySpec.from_library(resource, resource=True)
+        keyword = spec.keywords[0]
+        assert keyword.args.positional_or_named == ("count",)
+        assert (keyword.short_doc, keyword.doc) == ("Selects one.", "Selects one.\n\nMore.")
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import patch
+
+from RobotDebug import lexer
+from RobotDebug.lexer import TokenCache, get_robot_token
+
+TEXTS = [
+    "Log    hello",
+    "Log    ${x}\n${a} =    Set Variable    1\n\nLog    y",
+    "Log    a\n   \n# comment\nLog    b\n",
+    "FOR    ${i}    IN RANGE    3\n    Log    ${i}\nEND",
+    "Log    a\n...    b",
+    "*** Keywords ***\nMy Keyword\n    Log    hi",
+    "[Tags]    a\n[Tags]    b\nLog    x",
+    "[Documentation]    a\nLog    x\n[Documentation]    b",
+]
+
+
+def as_tuples(tokens):
+    return [(t.type, t.value, t.lineno, t.col_offset, t.error) for t in tokens]
+
+
+class TokenCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = TokenCache()
+
+    def test_same_tokens_as_tokenizing_the_text(self):
+        for text in TEXTS:
+            assert as_tuples(self.cache.get(text).tokens) == as_tuples(get_robot_token(text))
+
+    def test_text_is_tokenized_once(self):
+        with patch.object(lexer, "get_robot_token", wraps=get_robot_token) as tokenize:
+            first = self.cache.get(TEXTS[3])
+            assert self.cache.get(TEXTS[3]) is first
+            assert tokenize.call_count == 1
+
+    def test_only_changed_lines_are_tokenized(self):
+        self.cache.get("Log    a\nLog    b\nLog    c")
+        with patch.object(lexer, "get_robot_token", wraps=get_robot_token) as tokenize:
+            tokens = self.cache.get("Log    a\nLog    changed\nLog    c").tokens
+            tokenize.assert_called_once_with("Log    changed")
+        assert [t.value for t in tokens if t.type == "ARGUMENT"] == ["a", "changed", "c"]
+
+    def test_size_is_bounded(self):
+        cache = TokenCache(size=2)
+        for text in ["Log    1", "Log    2", "Log    3"]:
+            cache.get(text)
+        assert list(cache._texts) == ["Log    2", "Log    3"]
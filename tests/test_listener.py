@@ -0,0 +1,107 @@
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+from RobotDebug import Listener
+from RobotDebug.globals import StepMode
+
+listener_module = sys.modules["RobotDebug.RobotDebug"]
+
+
+def attrs(kwname, status="PASS", lineno=1):
+    return {
+        "kwname": kwname,
+        "type": "KEYWORD",
+        "status": status,
+        "assign": [],
+        "source": "/suites/login.robot",
+        "lineno": lineno,
+    }
+
+
+class ListenerTestCase(unittest.TestCase):
+    def setUp(self):
+        for target, name in [
+            (Listener, "instance"),
+            (listener_module, "print_output"),
+            (listener_module, "step_renderer"),
+        ]:
+            patcher = patch.object(target, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.library = Mock()
+
+    def listener(self, **kwargs):
+        return Listener(library=self.library, **kwargs)
+
+    def run_keyword(self, listener, name, status="PASS", children=(), lineno=1):
+        listener.start_keyword(name, attrs(name, lineno=lineno))
+        for child in children:
+            child()
+        listener.end_keyword(name, attrs(name, status, lineno))
+
+    def test_failure_opens_the_shell_once(self):
+        listener = self.listener()
+        self.run_keyword(
+            listener,
+            "Outer",
+            "FAIL",
+            [lambda: self.run_keyword(listener, "Fail", "FAIL", lineno=7)],
+        )
+        self.library._debug.assert_called_once_with(muted=True)
+        self.library._update_source_position.assert_called_once_with(attrs("Fail", "FAIL", 7))
+        assert not listener.keyword_stack
+
+    def test_failure_of_muting_keyword_child_is_ignored(self):
+        listener = self.listener()
+        self.run_keyword(
+            listener,
+            "Run Keyword And Ignore Error",
+            children=[
+                lambda: self.run_keyword(
+                    listener,
+                    "Keyword",
+                    "FAIL",
+                    [lambda: self.run_keyword(listener, "Fail", "FAIL")],
+                )
+            ],
+        )
+        self.library._debug.assert_not_called()
+        assert not listener.keyword_stack
+        self.run_keyword(listener, "Fail", "FAIL")
+        self.library._debug.assert_called_once_with(muted=True)
+
+    def test_step_stops_at_keyword(self):
+        listener = self.listener()
+        listener.step_mode = StepMode.INTO
+        listener.start_keyword("Log", attrs("Log", lineno=3))
+        assert listener.current_keyword == attrs("Log", lineno=3)
+        self.library._update_source_position.assert_called_once_with(attrs("Log", lineno=3))
+        self.library._debug.assert_called_once_with(muted=True)
+
+    def test_library_listener_keeps_stack_balanced(self):
+        listener = self.listener(is_library=True)
+        listener.start_keyword("Inner", attrs("Inner"))
+        assert listener.current_keyword == attrs("Inner")
+        listener.end_keyword("Inner", attrs("Inner", "FAIL"))
+        # the end of the keyword importing the library, whose start was not seen
+        listener.end_keyword("Import Library", attrs("Import Library"))
+        assert listener.current_keyword is None
+        self.run_keyword(listener, "Later", children=[lambda: self.run_keyword(listener, "Log")])
+        assert not listener.keyword_stack
+        self.library._debug.assert_not_called()
+
+    def test_scopes_are_only_profiled_when_enabled(self):
+        listener = self.listener()
+        listener.start_suite("Suite", {})
+        listener.start_test("Test", {})
+        self.run_keyword(listener, "Log")
+        listener.end_test("Test", {})
+        assert not listener.profiler.call_tree.children
+        listener.set_profiling(True)
+        listener.start_test("Other", {})
+        self.run_keyword(listener, "Log")
+        listener.end_test("Other", {})
+        listener.end_suite("Suite", {})
+        assert list(listener.profiler.call_tree.children) == ["Other"]
+        assert not listener.profiler._scopes
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+
+from robot.utils import DotDict
+
+from RobotDebug import previews
+from RobotDebug.previews import PREVIEW_LENGTH, VariablePreviews, preview
+
+
+class Unrepresentable:
+    def __repr__(self):
+        raise RuntimeError("no repr")
+
+
+class PreviewTestCase(unittest.TestCase):
+    def test_large_values_are_truncated(self):
+        for value in ["x" * 10_000_000, b"x" * 10_000_000, list(range(100_000))]:
+            text = preview(value)
+            assert len(text) <= PREVIEW_LENGTH
+            assert "..." in text
+
+    def test_dict_subclasses_are_not_fully_represented(self):
+        value = DotDict((f"key{index}", "v" * 1000) for index in range(10_000))
+        text = preview(value)
+        assert text.startswith("{'key0': 'vvv")
+        assert len(text) <= PREVIEW_LENGTH
+
+    def test_small_values_are_unchanged(self):
+        assert preview({"a": [1, 2]}) == "{'a': [1, 2]}"
+        assert preview("line\nbreak") == "'line\\nbreak'"
+
+    def test_failing_repr(self):
+        assert preview(Unrepresentable()).startswith("<")
+
+
+class VariablePreviewsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.previews = VariablePreviews()
+
+    def test_immutable_values_are_cached(self):
+        value = "x" * 100
+        with patch.object(previews, "preview", wraps=preview) as render:
+            first = self.previews.get("${x}", value)
+            self.previews.next_epoch()
+            assert self.previews.get("${x}", value) == first
+            assert render.call_count == 1
+
+    def test_mutable_values_are_cached_until_the_next_prompt(self):
+        value = [1]
+        assert self.previews.get("@{x}", value) == "[1]"
+        value.append(2)
+        assert self.previews.get("@{x}", value) == "[1]"
+        self.previews.next_epoch()
+        assert self.previews.get("@{x}", value) == "[1, 2]"
+
+    def test_new_object_is_rendered(self):
+        self.previews.get("${x}", "old")
+        assert self.previews.get("${x}", "new") == "'new'"
+
+    def test_retain(self):
+        self.previews.get("${x}", 1)
+        self.previews.get("${y}", 2)
+        self.previews.retain(["${y}"])
+        assert list(self.previews._previews) == ["${y}"]
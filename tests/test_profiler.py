@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch
+
+from RobotDebug.profiler import KeywordProfiler, KeywordStats
+
+KEYWORD = {"type": "KEYWORD"}
+ITERATION = {"type": "ITERATION"}
+
+
+class KeywordProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = KeywordProfiler()
+        self.now = 0
+        patcher = patch("RobotDebug.profiler.perf_counter_ns", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_keyword(self, name, duration, children=(), attrs=KEYWORD):
+        self.profiler.start_keyword(name, attrs)
+        for child in children:
+            child()
+        self.now += duration
+        self.profiler.end_keyword(name, attrs)
+
+    def test_self_and_total_time(self):
+        self.run_keyword(
+            "High",
+            1000,
+            [
+                lambda: self.run_keyword("Low", 3000),
+                lambda: self.run_keyword(
+                    "${i} = 1", 10, [lambda: self.run_keyword("Low", 5000)], ITERATION
+                ),
+            ],
+        )
+        high, low = self.profiler.stats["High"], self.profiler.stats["Low"]
+        assert (high.calls, high.total_time, high.self_time, high.max_depth) == (1, 9010, 1010, 1)
+        assert (low.calls, low.total_time, low.self_time, low.max_depth) == (2, 8000, 8000, 2)
+        assert "${i} = 1" not in self.profiler.stats
+        assert [stats.name for stats in self.profiler.hot_keywords("total")] == ["High", "Low"]
+
+    def test_recursion_is_not_counted_twice(self):
+        self.run_keyword("Recursive", 100, [lambda: self.run_keyword("Recursive", 100)])
+        stats = self.profiler.stats["Recursive"]
+        assert (stats.calls, stats.total_time, stats.self_time) == (2, 200, 200)
+
+    def test_paused_time_is_excluded(self):
+        def debug_shell():
+            with self.profiler.paused():
+                self.now += 10**9
+                self.run_keyword("Run From Shell", 10)
+
+        self.run_keyword("Debugged", 100, [debug_shell])
+        assert self.profiler.stats["Debugged"].total_time == 100
+        assert "Run From Shell" not in self.profiler.stats
+
+    def test_keywords_running_before_enabling_are_ignored(self):
+        self.profiler.end_keyword("Already Running", KEYWORD)
+        assert not self.profiler.stats
+
+    def test_keywords_running_when_disabled_are_dropped(self):
+        self.profiler.start_keyword("Outer", KEYWORD)
+        self.profiler.start_keyword("Inner", KEYWORD)
+        self.profiler.drop_open_keywords()
+        self.run_keyword("Later", 1000)
+        self.profiler.end_keyword("Outer", KEYWORD)
+        assert list(self.profiler.folded_stacks()) == ["Later 1"]
+        assert self.profiler.stats["Later"].max_depth == 1
+        assert self.profiler.stats["Outer"].active == 0
+        assert not self.profiler.stats["Outer"].calls
+
+    def test_folded_stacks(self):
+        self.profiler.start_scope("Suite")
+        self.profiler.start_scope("Test")
+        for _ in range(2):
+            self.run_keyword("High", 1000, [lambda: self.run_keyword("a;b", 2000)])
+        self.profiler.end_scope()
+        assert sorted(self.profiler.folded_stacks()) == [
+            "Suite;Test;High 2",
+            "Suite;Test;High;a,b 4",
+        ]
+
+    def test_call_stacks_are_bounded(self):
+        self.profiler.max_call_stacks = 2
+        for name in ["One", "Two", "Three", "Four"]:
+            self.run_keyword(name, 1000)
+        assert sorted(self.profiler.folded_stacks()) == ["One 1", "Two 1", "[truncated] 2"]
+
+    def test_percentile(self):
+        stats = KeywordStats("Keyword")
+        for _ in range(95):
+            stats.add(10_000, 10_000, 1)
+        for _ in range(5):
+            stats.add(10**9, 10**9, 1)
+        assert 10_000 <= stats.percentile(0.95) < 12_000
+        assert stats.percentile(1) == 10**9
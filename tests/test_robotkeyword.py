@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from robot.running import ResourceFileBuilder
+from robot.running import TestSuite as RunningSuite
+
+from RobotDebug import robotkeyword
+from RobotDebug.globals import IS_RF_7
+from RobotDebug.robotkeyword import (
+    SHELL_RESOURCE_SOURCE,
+    ParsedCommandCache,
+    get_lib_keywords,
+    invalidate_lib_keywords,
+)
+
+
+class LibKeywordsTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name, "common.resource")
+        patcher = patch.dict(robotkeyword._lib_keywords_cache, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def import_resource(self, *keywords):
+        self.path.write_text(
+            "*** Keywords ***\n" + "".join(f"{name}\n    No Operation\n" for name in keywords)
+        )
+        return ResourceFileBuilder().build(str(self.path))
+
+    def test_resources_with_same_name_have_own_keywords(self):
+        first = self.import_resource("First")
+        second = self.import_resource("Second")
+        assert first.name == second.name
+        assert [keyword.name for keyword in get_lib_keywords(first)] == ["First"]
+        assert [keyword.name for keyword in get_lib_keywords(second)] == ["Second"]
+        assert get_lib_keywords(first) is get_lib_keywords(first)
+
+    def test_keywords_are_rebuilt_when_resource_is_modified(self):
+        resource = self.import_resource("First")
+        keywords = get_lib_keywords(resource)
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert get_lib_keywords(resource) is not keywords
+
+    def test_invalidate_forgets_libraries_not_imported(self):
+        first = self.import_resource("First")
+        second = self.import_resource("Second")
+        get_lib_keywords(first)
+        get_lib_keywords(second)
+        with patch.object(robotkeyword, "get_libs", lambda: [second]):
+            invalidate_lib_keywords()
+        assert list(robotkeyword._lib_keywords_cache) == [id(second)]
+
+
+class ParsedCommandCacheTestCase(unittest.TestCase):
+    def test_commands_are_parsed_once(self):
+        cache = ParsedCommandCache()
+        with patch.object(
+            robotkeyword, "_parse_test_from_string", wraps=robotkeyword._parse_test_from_string
+        ) as parse:
+            first, assignments = cache.get("${a}    ${b}=    Set Variable    1    2")
+            second, _ = cache.get("${a}  ${b}=\tSet Variable  1  2")
+        assert parse.call_count == 1
+        assert assignments == ("${a}", "${b}=")
+        assert first is not second
+        assert first.body is not second.body
+        assert [kw.name for kw in second.body] == ["Set Variable"]
+
+    def test_least_recently_used_command_is_dropped(self):
+        cache = ParsedCommandCache(size=2)
+        cache.get("Log    1")
+        cache.get("Log    2")
+        cache.get("Log    1")
+        cache.get("Log    3")
+        assert [key[1] for key in cache._parsed] == ["Log    1", "Log    3"]
+
+    def test_assignments_of_all_lines(self):
+        _, assignments = ParsedCommandCache().get(
+            "${x}    Set Variable    1\n${y}    Set Variable    2\n${x}    Set Variable    3"
+        )
+        assert assignments == ("${x}", "${y}")
+
+
+SHELL_SUITE = r"""
+*** Variables ***
+${FIRST}       *** Keywords ***\nMy Keyword\n\tRETURN\tfirst\n
+${SECOND}      *** Keywords ***\nMy_keyword\n\tRETURN\tsecond\n
+${VARIABLE}    *** Variables ***\n\${value}\tdefined\n
+
+*** Test Cases ***
+Keywords Defined Again Replace Old Ones
+    Import    ${FIRST}
+    ${result}    My Keyword
+    Should Be Equal    ${result}    first
+    Import    ${SECOND}
+    ${result}    My Keyword
+    Should Be Equal    ${result}    second
+    Import    ${VARIABLE}
+    Should Be Equal    ${value}    defined
+    ${keywords}    Evaluate    [kw.name for kw in $resources[-1].keywords]
+    Should Be Equal    ${keywords}    ${{["My_keyword"]}}
+    ${search order}    Set Library Search Order
+    Should Be Equal    ${search order}    ${{("RobotDebug_keywords",)}}
+
+*** Keywords ***
+Import
+    [Arguments]    ${snippet}
+    Evaluate    RobotDebug.robotkeyword._import_resource_from_string($snippet)
+    ...    modules=RobotDebug.robotkeyword
+    VAR    ${resources}    ${{RobotDebug.robotlib.get_resources()}}    scope=TEST
+"""
+
+
+@unittest.skipUnless(IS_RF_7, "TestSuite.from_string and VAR require Robot Framework 7")
+class ImportResourceFromStringTestCase(unittest.TestCase):
+    def test_snippets_are_imported_into_one_resource(self):
+        suite = RunningSuite.from_string(SHELL_SUITE)
+        result = suite.run(output=None, stdout=StringIO(), stderr=StringIO())
+        test = result.suite.tests[0]
+        assert test.passed, test.message
+        assert not SHELL_RESOURCE_SOURCE.exists()
@@ -0,0 +1,51 @@
+import unittest
+from types import SimpleNamespace
+
+from RobotDebug.keywordcache import ArgumentsSpec
+from RobotDebug.search import SearchIndex, tokenize
+
+KEYWORDS = [
+    ("Upload File", ("locator", "file_path"), "Uploads the file at ``file_path`` to an input."),
+    ("Create File", ("path", "content"), "Creates a file with the given content."),
+    ("Choose File", ("locator", "file_path"), "Inputs the ``file_path`` into a file input."),
+    ("Log", ("message", "level"), "Logs the given message with the given level."),
+    ("Get Text", ("locator",), "Returns the text of the element."),
+]
+
+
+def entries():
+    lib = SimpleNamespace(name="Lib")
+    for name, args, doc in KEYWORDS:
+        keyword = SimpleNamespace(name=name, parent=lib, args=ArgumentsSpec("", args))
+        yield keyword, doc
+
+
+class SearchIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(entries())
+
+    def search(self, text, limit=10):
+        return [keyword.name for _, keyword in self.index.search(text, limit)]
+
+    def test_tokenize(self):
+        assert tokenize("Uploads the file_path to maxSplit") == [
+            "upload",
+            "fil",
+            "path",
+            "max",
+            "split",
+        ]
+        assert tokenize("files compared directories") == tokenize("file compare directory")
+
+    def test_name_matches_rank_first(self):
+        assert self.search("the keyword that uploads a file")[0] == "Upload File"
+        assert set(self.search("file")) == {"Upload File", "Create File", "Choose File"}
+
+    def test_argument_names_and_documentation_match(self):
+        assert self.search("level") == ["Log"]
+        assert self.search("element text") == ["Get Text"]
+
+    def test_limit_and_unknown_terms(self):
+        assert self.search("file", limit=1) == ["Upload File"]
+        assert self.search("zzz") == []
+        assert self.search("the") == []
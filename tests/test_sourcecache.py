@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from RobotDebug.sourcecache import SourceCache
+
+
+class SourceCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name, "suite.robot")
+        self.path.write_text("*** Test Cases ***\nTest\n    Log    hello\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lines(self):
+        source = SourceCache().get(self.path)
+        assert source.line_count == 3
+        assert source.line(3) == "    Log    hello\n"
+        assert source.line(4) is None
+        assert source.line(2) == "Test\n"
+
+    def test_bom_is_skipped(self):
+        self.path.write_bytes(b"\xef\xbb\xbf*** Keywords ***")
+        source = SourceCache().get(self.path)
+        assert source.text == "*** Keywords ***"
+        assert source._offsets is None
+        assert source.line(1) == "*** Keywords ***"
+
+    def test_reloaded_when_modified(self):
+        cache = SourceCache()
+        assert cache.get_line(self.path, 2) == "Test\n"
+        self.path.write_text("*** Test Cases ***\nOther Test\n", encoding="utf-8")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert cache.get_line(self.path, 2) == "Other Test\n"
+        assert cache.total_bytes == self.path.stat().st_size
+
+    def test_evicts_least_recently_used(self):
+        size = self.path.stat().st_size
+        other = Path(self.tmpdir.name, "other.robot")
+        other.write_text(self.path.read_text())
+        cache = SourceCache(max_bytes=size + 1)
+        cache.get(self.path)
+        cache.get(other)
+        assert self.path not in cache
+        assert other in cache
+        assert cache.total_bytes == size
+
+    def test_missing_file(self):
+        assert SourceCache().get(Path(self.tmpdir.name, "missing.robot")) is None
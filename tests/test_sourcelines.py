@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from RobotDebug import sourcelines
+from RobotDebug.sourcelines import HighlightCache, StepRenderer
+
+SUITE = """*** Test Cases ***
+First
+    Log    one    \n
+    # comment
+Second
+    Log    two
+*** Keywords ***
+Keyword
+    No Operation
+"""
+
+
+def text(tokens):
+    return "".join(value for _token, value in tokens)
+
+
+class HighlightedSourceTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name, "suite.robot")
+        self.path.write_text(SUITE, encoding="utf-8")
+
+    def test_lines_and_scopes(self):
+        highlighted = HighlightCache().get(self.path)
+        assert highlighted.line_count == 10
+        assert highlighted.line_text(3) == "    Log    one    \n"
+        assert highlighted.scope_starts == [1, 2, 6, 8, 9]
+        assert highlighted.scope(1) == (1, 2)
+        assert highlighted.scope(4) == (2, 6)
+        assert highlighted.scope(6) == (6, 8)
+        assert highlighted.scope(10) == (9, 11)
+
+    def test_lines_are_numbered(self):
+        highlighted = HighlightCache().get(self.path)
+        assert text(highlighted.tokens(3, 5, 4)) == "  3       Log    one    \n  4 ->\n"
+        assert text(highlighted.tokens(-3, 2, 1)) == "  1 ->*** Test Cases ***\n"
+
+    def test_highlighted_again_when_modified(self):
+        cache = HighlightCache()
+        highlighted = cache.get(self.path)
+        assert cache.get(self.path) is highlighted
+        self.path.write_text("*** Test Cases ***\nOther\n", encoding="utf-8")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert cache.get(self.path).line_text(2) == "Other\n"
+
+    def test_cache_is_limited_by_bytes(self):
+        other = Path(self.path.parent, "other.robot")
+        other.write_text(SUITE, encoding="utf-8")
+        cache = HighlightCache(max_bytes=len(SUITE) + 1)
+        cache.get(self.path)
+        cache.get(other)
+        assert list(cache._files) == [str(other)]
+        assert cache.total_bytes == len(SUITE)
+
+    def test_missing_file(self):
+        assert HighlightCache().get(Path(self.path.parent, "missing.robot")) is None
+
+
+class StepRendererTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name, "suite.robot")
+        self.path.write_text(SUITE, encoding="utf-8")
+
+    def test_relative_path(self):
+        renderer = StepRenderer()
+        with patch.object(Path, "cwd", return_value=self.path.parent):
+            assert renderer.relative_path(str(self.path)) == "suite.robot"
+        with patch.object(Path, "cwd", return_value=Path(self.path.anchor, "elsewhere")):
+            assert renderer.relative_path(str(self.path)) == str(self.path)
+        assert renderer.relative_path(None) == ""
+
+    def test_render(self):
+        renderer = StepRenderer()
+        with patch.object(Path, "cwd", return_value=self.path.parent):
+            assert text(renderer.render(str(self.path), 3)) == " suite.robot:3\n3 ->     Log    one"
+            assert text(renderer.render(str(self.path), 42)) == " suite.robot:42"
+
+    def test_line_fragments_are_highlighted_once_the_file_is(self):
+        renderer = StepRenderer()
+        cache = HighlightCache()
+        with patch.object(sourcelines, "highlight_cache", cache):
+            fragments = renderer.line_fragments(str(self.path), 7)
+            assert fragments == [("", "    Log    two")]
+            assert renderer.line_fragments(str(self.path), 7) is fragments
+            assert not cache._files
+            cache.get(self.path)
+            fragments = renderer.line_fragments(str(self.path), 7)
+            assert renderer.line_fragments(str(self.path), 7) is fragments
+            assert ("class:pygments.name.function", "Log") in fragments
@@ -0,0 +1,40 @@
+import unittest
+
+from RobotDebug.debugcmd import TIMEIT_OPTION, _calibrate, _format_time, parse_options
+
+DEFAULTS = {"n": 0, "r": 5}
+
+
+class TimeitTestCase(unittest.TestCase):
+    def test_options(self):
+        options, command = parse_options(TIMEIT_OPTION, "-n 10 -r 3 Log    hello", DEFAULTS)
+        assert options == {"n": "10", "r": "3"}
+        assert command == "Log    hello"
+        options, command = parse_options(TIMEIT_OPTION, "Log    -n 10", DEFAULTS)
+        assert options == DEFAULTS
+        assert command == "Log    -n 10"
+
+    def test_options_in_any_order(self):
+        options, command = parse_options(TIMEIT_OPTION, "-r 3  -n 10 Log    x", DEFAULTS)
+        assert options == {"n": "10", "r": "3"}
+        assert command == "Log    x"
+        options, command = parse_options(TIMEIT_OPTION, "-r 2 Log    x", DEFAULTS)
+        assert options == {"n": 0, "r": "2"}
+        assert command == "Log    x"
+
+    def test_calibrate_like_autorange(self):
+        tried = []
+
+        def timer(number):
+            tried.append(number)
+            return number * 0.01
+
+        number = _calibrate(timer)
+        assert tried == [1, 2, 5, 10, 20]
+        assert number == tried[-1]
+
+    def test_format_time(self):
+        assert _format_time(1.5) == "1.5 s"
+        assert _format_time(0.0123) == "12.3 ms"
+        assert _format_time(0.000042) == "42 µs"
+        assert _format_time(0.0000005) == "500 ns"